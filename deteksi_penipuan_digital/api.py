@@ -0,0 +1,267 @@
+"""
+REST API (ASGI) untuk scoring tanpa Streamlit, misalnya untuk mail gateway dan ekstensi browser.
+
+Endpoint:
+    POST /v1/url    {"url": "..."} atau {"urls": ["...", ...]}
+    POST /v1/email  {"content": "...", "sender": "..."} atau {"emails": [{...}, ...]}
+    POST /v1/phone  {"number": "..."} atau {"numbers": ["...", ...]}
+    POST /v1/apk    multipart/form-data, field "file" berisi file APK
+    GET  /healthz, /readyz (200 setelah warm-up selesai), /metrics (format Prometheus)
+
+- Handler async; pekerjaan CPU (fitur URL, model, regex, unzip APK) dijalankan di thread pool
+  sehingga event loop tetap menerima request lain
+- Batch: satu request boleh berisi sampai MAX_BATCH_SIZE item; URL dalam satu batch diskor
+  dengan ekstraksi fitur kolumnar + satu predict_proba (batch_scan.scan_chunk)
+- Multi-worker: --workers N menjalankan N proses uvicorn. Artefak model di-memory-map,
+  jadi array forest dipakai bersama antar worker lewat page cache
+- Skor URL hanya memakai fitur URL (tanpa probe WHOIS/HTTP) agar latensi stabil di ratusan RPS.
+  Aturan setelah model (phishing_detector.apply_url_rules: suffix akademik/pemerintah, judi)
+  serta laporan pengguna dan blocklist tetap diterapkan seperti di UI. Karena fitur probe tidak
+  ada, aturan akademik/pemerintah bisa lebih jarang menurunkan verdict dibanding UI
+
+Contoh:
+    python api.py --port 8000 --workers 4
+    curl -X POST localhost:8000/v1/url -H 'Content-Type: application/json' -d '{"url": "http://paypa1.com/login"}'
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field, model_validator
+from starlette.concurrency import run_in_threadpool
+from typing_extensions import Annotated
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'utils'))
+import phishing_detector
+import warmup
+import metrics
+from batch_scan import scan_chunk, finalize_result
+from url_parse import parse_url
+
+MAX_BATCH_SIZE = 1000
+MAX_URL_LENGTH = 8192
+MAX_EMAIL_LENGTH = 200000
+MAX_APK_SIZE = 100 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1 << 20
+# Jumlah thread untuk pekerjaan CPU per worker (env diisi oleh main() agar diwarisi semua worker)
+DEFAULT_THREADS = 40
+THREADS_ENV = 'DETEKSI_API_THREADS'
+
+URLText = Annotated[str, Field(min_length=1, max_length=MAX_URL_LENGTH)]
+PhoneText = Annotated[str, Field(min_length=1, max_length=64)]
+
+
+class URLRequest(BaseModel):
+    url: Optional[URLText] = None
+    urls: Optional[List[URLText]] = Field(None, max_length=MAX_BATCH_SIZE)
+
+    @model_validator(mode='after')
+    def _exactly_one(self):
+        if (self.url is None) == (self.urls is None):
+            raise ValueError("Isi tepat salah satu: 'url' atau 'urls'")
+        return self
+
+
+class Email(BaseModel):
+    content: str = Field(max_length=MAX_EMAIL_LENGTH)
+    sender: str = Field('', max_length=320)
+
+
+class EmailRequest(BaseModel):
+    content: Optional[str] = Field(None, max_length=MAX_EMAIL_LENGTH)
+    sender: str = Field('', max_length=320)
+    emails: Optional[List[Email]] = Field(None, max_length=MAX_BATCH_SIZE)
+
+    @model_validator(mode='after')
+    def _exactly_one(self):
+        if (self.content is None) == (self.emails is None):
+            raise ValueError("Isi tepat salah satu: 'content' atau 'emails'")
+        return self
+
+
+class PhoneRequest(BaseModel):
+    number: Optional[PhoneText] = None
+    numbers: Optional[List[PhoneText]] = Field(None, max_length=MAX_BATCH_SIZE)
+
+    @model_validator(mode='after')
+    def _exactly_one(self):
+        if (self.number is None) == (self.numbers is None):
+            raise ValueError("Isi tepat salah satu: 'number' atau 'numbers'")
+        return self
+
+
+# Analyzer dibuat sekali per worker (import pandas/email_validator/zipfile saat pertama dipakai)
+_analyzers = {}
+
+
+def _analyzer(name):
+    analyzer = _analyzers.get(name)
+    if analyzer is None:
+        if name == 'email':
+            from process_email import EmailProcessor
+            analyzer = EmailProcessor()
+        elif name == 'phone':
+            from validate_hp import PhoneNumberValidator
+            analyzer = PhoneNumberValidator()
+        else:
+            from apk_features import APKAnalyzer
+            analyzer = APKAnalyzer()
+        _analyzers[name] = analyzer
+    return analyzer
+
+
+def score_url(url):
+    """Skor satu URL lewat predict_phishing_with_model (jalur dict, tanpa DataFrame)"""
+    parsed = parse_url(url)
+    model = phishing_detector.get_model()
+    prediction, confidence = phishing_detector.predict_phishing_with_model(url, model, parsed)
+    result = {
+        'url': url,
+        'prediction': int(prediction),
+        'is_phishing': int(prediction) == 1,
+        'confidence': round(float(confidence), 4),
+        'whitelisted': phishing_detector.is_whitelisted(url, parsed),
+    }
+    return finalize_result(result, parsed)
+
+
+def score_urls(urls):
+    """Skor batch URL: satu predict_proba untuk semua URL valid; URL tidak valid mendapat 'error'"""
+    return scan_chunk(urls, phishing_detector.get_model())
+
+
+def analyze_emails(emails):
+    processor = _analyzer('email')
+    return [processor.analyze_email(email.content, email.sender) for email in emails]
+
+
+def validate_numbers(numbers):
+    validator = _analyzer('phone')
+    return [validator.validate_phone_number(number) for number in numbers]
+
+
+@asynccontextmanager
+async def lifespan(app):
+    import anyio.to_thread
+    anyio.to_thread.current_default_thread_limiter().total_tokens = int(os.environ.get(THREADS_ENV, DEFAULT_THREADS))
+    # Banyak thread scoring bersamaan: gabungkan panggilan model satu baris (sebelum warm-up load model)
+    os.environ.setdefault(phishing_detector.BATCHING_ENV, '1')
+    # Warm-up di background: /healthz langsung hidup, /readyz 200 setelah model & index siap
+    warmup.start_warm_up()
+    metrics.REGISTRY.start_persistence(role='api')
+    yield
+
+
+app = FastAPI(title='Deteksi Penipuan Digital API', version='1', lifespan=lifespan)
+
+
+@app.middleware('http')
+async def record_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get('route')
+    endpoint = getattr(route, 'path', 'other')
+    metrics.API_REQUESTS.inc(endpoint=endpoint, status=str(response.status_code))
+    metrics.API_REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+    return response
+
+
+@app.post('/v1/url')
+async def url_endpoint(body: URLRequest):
+    if body.url is not None:
+        try:
+            result = await run_in_threadpool(score_url, body.url)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f'URL tidak valid: {e}')
+        metrics.URL_ANALYSES.inc(source='api')
+        return result
+    results = await run_in_threadpool(score_urls, body.urls)
+    metrics.URL_ANALYSES.inc(len(results), source='api')
+    return {'results': results}
+
+
+@app.post('/v1/email')
+async def email_endpoint(body: EmailRequest):
+    emails = body.emails if body.emails is not None else [Email(content=body.content, sender=body.sender)]
+    results = await run_in_threadpool(analyze_emails, emails)
+    for result in results:
+        metrics.EMAIL_ANALYSES.inc(result='spam' if result['is_spam'] else 'aman')
+    return results[0] if body.emails is None else {'results': results}
+
+
+@app.post('/v1/phone')
+async def phone_endpoint(body: PhoneRequest):
+    numbers = body.numbers if body.numbers is not None else [body.number]
+    results = await run_in_threadpool(validate_numbers, numbers)
+    for result in results:
+        metrics.PHONE_CHECKS.inc(result='mencurigakan' if result['is_suspicious'] else 'aman')
+    return results[0] if body.numbers is None else {'results': results}
+
+
+@app.post('/v1/apk')
+async def apk_endpoint(file: UploadFile = File(...)):
+    # Simpan upload ke file sementara secara bertahap (APK bisa sampai MAX_APK_SIZE)
+    fd, path = tempfile.mkstemp(suffix='.apk')
+    try:
+        size = 0
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_APK_SIZE:
+                    raise HTTPException(status_code=413, detail='Ukuran APK melebihi 100MB')
+                f.write(chunk)
+        result = await run_in_threadpool(_analyzer('apk').analyze_apk, path)
+    finally:
+        os.remove(path)
+    result['filename'] = file.filename
+    return result
+
+
+@app.get('/healthz')
+async def healthz():
+    return {'status': 'ok'}
+
+
+@app.get('/readyz')
+async def readyz():
+    status = warmup.readiness_status()
+    return JSONResponse(status, status_code=200 if status['ready'] else 503)
+
+
+@app.get('/metrics')
+async def metrics_endpoint():
+    # Metrik milik worker yang melayani scrape ini (label pid). Dengan --workers N setiap scrape
+    # mengenai worker acak, jadi seri per pid bisa terlambat update; untuk total yang lengkap
+    # jalankan satu worker per instance, atau jumlahkan di Prometheus dengan sum without (pid)
+    return PlainTextResponse(metrics.REGISTRY.render_prometheus(), media_type='text/plain; version=0.0.4')
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='REST API deteksi penipuan digital (uvicorn)')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1, help='Jumlah proses worker')
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS,
+                        help='Thread pool untuk pekerjaan CPU per worker')
+    args = parser.parse_args(argv)
+
+    os.environ[THREADS_ENV] = str(args.threads)
+    uvicorn.run(
+        'api:app', host=args.host, port=args.port, workers=args.workers,
+        app_dir=os.path.dirname(os.path.abspath(__file__)), access_log=False,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,37 +1,67 @@
-import streamlit as st
-import os
-import sys
-
-# Add the project root to the Python path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-from views.sidebar import create_sidebar
-from views.phishing_view import show_phishing_detection
-from views.hp_view import show_hp_detection
-from views.email_view import show_email_detection
-from views.apk_view import show_apk_detection
-
-def main():
-    st.set_page_config(
-        page_title="Deteksi Penipuan Digital",
-        page_icon="🛡️",
-        layout="wide",
-        initial_sidebar_state="expanded"
-    )
-
-    # Custom CSS (gunakan path absolut agar aman di lokal & Streamlit Cloud)
-    css_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "style", "custom.css")
-    if os.path.exists(css_path):
-        with open(css_path) as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-    else:
-        st.warning("File CSS kustom `style/custom.css` tidak ditemukan. Pastikan file ini ikut di-push ke repository jika ingin tampilan kustom.")
-    
-    # Sidebar
-    create_sidebar()
-    
-    # Main content: hanya tampilkan phishing detection
-    show_phishing_detection()
-
-if __name__ == "__main__":
+import streamlit as st
+import importlib
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from views.sidebar import create_sidebar
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'utils'))
+import warmup
+from metrics import REGISTRY
+
+# Registry view: modul view (dan dependensi beratnya) baru di-import saat view dipilih
+VIEWS = {
+    'phishing': ('views.phishing_view', 'show_phishing_detection'),
+    'hp': ('views.hp_view', 'show_hp_detection'),
+    'email': ('views.email_view', 'show_email_detection'),
+    'apk': ('views.apk_view', 'show_apk_detection'),
+}
+DEFAULT_VIEW = 'phishing'
+
+@st.cache_resource(show_spinner=False)
+def start_background_services():
+    """
+    Sekali per proses server: server readiness (/readyz, /metrics), warm-up model/index di
+    background agar load model tidak terjadi di tengah request pengguna pertama, dan
+    penyimpanan berkala metrik operasional.
+    """
+    REGISTRY.start_persistence(role='streamlit')
+    warmup.start_readiness_server()
+    warmup.start_warm_up()
+    return True
+
+def load_view(name):
+    """Import modul view sesuai nama di VIEWS dan return fungsi render-nya"""
+    module_name, function_name = VIEWS[name]
+    return getattr(importlib.import_module(module_name), function_name)
+
+def main():
+    st.set_page_config(
+        page_title="Deteksi Penipuan Digital",
+        page_icon="🛡️",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    # Warm-up model & index (sekali per proses, di background)
+    start_background_services()
+
+    # Custom CSS (gunakan path absolut agar aman di lokal & Streamlit Cloud)
+    css_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "style", "custom.css")
+    if os.path.exists(css_path):
+        with open(css_path) as f:
+            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    else:
+        st.warning("File CSS kustom `style/custom.css` tidak ditemukan. Pastikan file ini ikut di-push ke repository jika ingin tampilan kustom.")
+    
+    # Sidebar
+    create_sidebar()
+    
+    # Main content: hanya tampilkan phishing detection
+    load_view(DEFAULT_VIEW)()
+
+if __name__ == "__main__":
     main() 
\ No newline at end of file
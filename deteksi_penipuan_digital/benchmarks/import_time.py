@@ -0,0 +1,88 @@
+"""
+Benchmark waktu import (cold start) aplikasi.
+
+Setiap target di-import di proses Python baru dengan `-X importtime`, diulang beberapa
+kali, lalu dilaporkan median total waktu import dan modul top-level paling berat.
+
+Contoh:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 10 --top 15 --json hasil_import.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+UTILS_DIR = os.path.join(PROJECT_DIR, 'utils')
+
+# Nama target -> kode yang dijalankan di proses baru
+TARGETS = {
+    'app': 'import app',
+    'app+phishing_view': 'import app; app.load_view("phishing")',
+    'phishing_detector': 'import phishing_detector',
+    'views (semua)': 'import app; [app.load_view(name) for name in app.VIEWS]',
+}
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure(code):
+    """Jalankan `code` di interpreter baru; return {modul top-level: waktu kumulatif (detik)}"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([PROJECT_DIR, UTILS_DIR, env.get('PYTHONPATH', '')])
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'Gagal menjalankan {code!r}:\n{result.stderr[-2000:]}')
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        # Indentasi 1 spasi = modul yang di-import langsung oleh kode target (top-level)
+        if match and len(match.group(3)) == 1:
+            modules[match.group(4)] = modules.get(match.group(4), 0) + int(match.group(2)) / 1e6
+    return modules
+
+
+def run(targets, repeat):
+    results = {}
+    for name, code in targets.items():
+        runs = [measure(code) for _ in range(repeat)]
+        totals = [sum(r.values()) for r in runs]
+        per_module = {}
+        for module in runs[0]:
+            per_module[module] = statistics.median(r.get(module, 0.0) for r in runs)
+        results[name] = {
+            'median_s': statistics.median(totals),
+            'min_s': min(totals),
+            'modules': dict(sorted(per_module.items(), key=lambda kv: -kv[1])),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark waktu import aplikasi (cold start)')
+    parser.add_argument('--repeat', type=int, default=5, help='Jumlah proses baru per target')
+    parser.add_argument('--top', type=int, default=10, help='Jumlah modul terberat yang ditampilkan')
+    parser.add_argument('--target', action='append', choices=sorted(TARGETS), help='Target tertentu saja')
+    parser.add_argument('--json', help='Simpan hasil lengkap ke file JSON')
+    args = parser.parse_args(argv)
+
+    targets = {name: TARGETS[name] for name in (args.target or TARGETS)}
+    results = run(targets, args.repeat)
+    for name, result in results.items():
+        print(f"{name}: median {result['median_s'] * 1000:.0f} ms (min {result['min_s'] * 1000:.0f} ms)")
+        for module, seconds in list(result['modules'].items())[:args.top]:
+            print(f'    {seconds * 1000:8.1f} ms  {module}')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,455 @@
+"""
+Benchmark latensi end-to-end pipeline phishing URL.
+
+Semua probe jaringan diarahkan ke server lokal (hermetic, tanpa internet):
+- HTTP: setiap request `requests` (HEAD redirect & favicon) ditulis ulang ke server stub
+  lokal; status respon deterministik per host (sebagian 301, sebagian favicon 404)
+- WHOIS: whois_client diarahkan ke server WHOIS stub lokal; cache WHOIS memakai file
+  sementara yang dikosongkan setiap pass sehingga setiap domain benar-benar di-query
+
+Dataset:
+- blackbox  : 10 URL di phishing_urls_for_blackbox_testing.csv, diulang --repeat kali
+- synthetic : korpus URL sintetis deterministik (--corpus-size, default 100.000, --seed)
+
+Yang diukur adalah entry point asli, predict_phishing_with_model dan extract_url_features,
+masing-masing di dalam satu trace (utils/tracing.py). Durasi per tahap diambil dari span
+yang dicatat kode aplikasi itu sendiri (allowlist, model_features, whois, redirect_head, ...),
+lalu dilaporkan p50/p95/p99 (mikrodetik) dan throughput (URL/detik). Hasil JSON ditulis dengan
+key terurut dan angka dibulatkan agar bisa di-diff antar commit; --compare membandingkan
+dengan hasil sebelumnya dan exit 1 jika ada tahap yang melambat melebihi toleransi.
+
+Sebelum pengukuran, pipeline dijalankan pada URL blackbox dan hasilnya diperiksa (prediksi
+valid, fitur bukan nilai fallback, probe tidak error/timeout dan benar-benar mencapai server
+stub). Jika ada yang gagal, benchmark berhenti dengan exit 1 alih-alih mengukur jalur error.
+
+Contoh:
+    python benchmarks/pipeline_latency.py --json benchmarks/baseline.json
+    python benchmarks/pipeline_latency.py --corpus-size 5000 --compare benchmarks/baseline.json
+    python benchmarks/pipeline_latency.py --http-latency-ms 30 --whois-latency-ms 80
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit
+from zlib import crc32
+
+import numpy as np
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_DIR, 'utils'))
+import metrics
+import phishing_detector
+import tracing
+import url_features
+import whois_client
+from allowlist import read_domains, ALLOWLIST_FILE
+from typosquat import read_brands, BRANDS_FILE
+from whois_cache import WhoisCache
+
+BLACKBOX_FILE = os.path.join(PROJECT_DIR, 'phishing_urls_for_blackbox_testing.csv')
+DEFAULT_CORPUS_SIZE = 100000
+DEFAULT_REPEAT = 100
+DEFAULT_WORKERS = 16
+# Tahap dianggap regresi jika p50/p95 lebih lambat dari baseline melebihi toleransi ini
+DEFAULT_TOLERANCE = 0.20
+# Selisih absolut di bawah ini diabaikan (noise timer pada tahap yang hanya beberapa mikrodetik)
+MIN_REGRESSION_US = 5.0
+
+# Bahan korpus sintetis
+SCHEMES = ['http', 'https']
+TLDS = ['com', 'net', 'org', 'info', 'xyz', 'top', 'id', 'co.id', 'online', 'site', 'io', 'app', 'co.uk']
+WORDS = [
+    'secure', 'login', 'account', 'update', 'verify', 'bank', 'pay', 'support', 'service', 'online',
+    'mail', 'shop', 'promo', 'gift', 'bonus', 'slot', 'id', 'center', 'portal', 'web', 'cloud', 'app',
+]
+PATH_WORDS = ['login', 'signin', 'account', 'update', 'reset', 'billing', 'index', 'home', 'help', 'auth', 'form']
+SHORTENERS = ['bit.ly', 'goo.gl', 'tinyurl.com']
+
+
+# ---------------------------------------------------------------------------
+# Server stub lokal
+# ---------------------------------------------------------------------------
+
+def _bucket(host, modulo):
+    return crc32(host.encode('utf-8', errors='replace')) % modulo
+
+
+class _StubHTTPHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+
+    def _respond(self):
+        if self.latency:
+            time.sleep(self.latency)
+        host = self.headers.get('Host', '')
+        if self.path.split('?', 1)[0].endswith('/favicon.ico'):
+            code = 200 if _bucket(host, 3) else 404
+        else:
+            code = 301 if _bucket(host, 5) == 0 else 200
+        self.send_response(code)
+        if code == 301:
+            self.send_header('Location', 'http://example.invalid/')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_HEAD = _respond
+    do_GET = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubWhoisHandler(socketserver.StreamRequestHandler):
+    latency = 0.0
+
+    def handle(self):
+        domain = self.rfile.readline().decode('utf-8', errors='replace').strip()
+        if self.latency:
+            time.sleep(self.latency)
+        bucket = _bucket(domain, 10)
+        if bucket == 0:
+            response = f'No match for "{domain.upper()}".\r\n'
+        else:
+            # Umur domain bervariasi: sebagian baru terdaftar, sebagian sudah bertahun-tahun
+            year = 2000 + _bucket(domain, 26)
+            response = f'Domain Name: {domain.upper()}\r\nCreation Date: {year}-0{1 + bucket % 9}-15T08:00:00Z\r\n'
+        self.wfile.write(response.encode('utf-8'))
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+@contextmanager
+def stub_network(http_latency=0.0, whois_latency=0.0):
+    """
+    Jalankan server HTTP & WHOIS stub di 127.0.0.1 (port bebas) dan arahkan probe ke sana
+    selama blok `with`. Return dict alamat server.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    http_handler = type('StubHTTPHandler', (_StubHTTPHandler,), {'latency': http_latency})
+    whois_handler = type('StubWhoisHandler', (_StubWhoisHandler,), {'latency': whois_latency})
+    http_server = ThreadingHTTPServer(('127.0.0.1', 0), http_handler)
+    http_server.daemon_threads = True
+    http_server.request_queue_size = 128
+    whois_server = _ThreadingTCPServer(('127.0.0.1', 0), whois_handler)
+    for server in (http_server, whois_server):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    http_address = http_server.server_address
+
+    class RewritingAdapter(HTTPAdapter):
+        """Kirim request ke server stub; host asli dibawa di header Host"""
+
+        def send(self, request, **kwargs):
+            parts = urlsplit(request.url)
+            request.headers['Host'] = parts.netloc
+            request.url = urlunsplit(('http', '%s:%d' % http_address, parts.path or '/', parts.query, ''))
+            return super().send(request, **kwargs)
+
+    adapter = RewritingAdapter(pool_maxsize=64)
+    original_get_adapter = requests.Session.get_adapter
+    # Hanya http/https yang dialihkan; adapter lain (misalnya file:// untuk daftar suffix) tetap
+    requests.Session.get_adapter = lambda self, url: (
+        adapter if url.lower().startswith(('http://', 'https://')) else original_get_adapter(self, url)
+    )
+    whois_client.use_whois_server(whois_server.server_address)
+    try:
+        yield {'http': http_address, 'whois': whois_server.server_address}
+    finally:
+        requests.Session.get_adapter = original_get_adapter
+        whois_client.use_whois_server(None)
+        for server in (http_server, whois_server):
+            server.shutdown()
+            server.server_close()
+
+
+@contextmanager
+def fresh_whois_cache(directory):
+    """Ganti cache WHOIS url_features dengan file baru yang kosong selama blok `with`"""
+    original = url_features._whois_cache
+    fd, path = tempfile.mkstemp(suffix='.db', dir=directory)
+    os.close(fd)
+    url_features._whois_cache = WhoisCache(path)
+    try:
+        yield url_features._whois_cache
+    finally:
+        url_features._whois_cache = original
+
+
+# ---------------------------------------------------------------------------
+# Dataset
+# ---------------------------------------------------------------------------
+
+def read_blackbox_urls(path=BLACKBOX_FILE):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [row['URL'].strip() for row in csv.DictReader(f) if row.get('URL', '').strip()]
+
+
+def synthetic_urls(n, seed=42):
+    """Korpus URL sintetis deterministik: campuran domain allowlist, typo brand, IP, shortener, dan domain acak"""
+    rng = random.Random(seed)
+    allowlisted = sorted(read_domains(ALLOWLIST_FILE))
+    brands = sorted(read_brands(BRANDS_FILE))
+    urls = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.15 and allowlisted:
+            host = rng.choice(['', 'www.', 'mail.', 'login.']) + rng.choice(allowlisted)
+        elif kind < 0.40 and brands:
+            brand = rng.choice(brands).split('.')[0]
+            i = rng.randrange(len(brand))
+            typo = brand[:i] + rng.choice('abcdefghijklmnopqrstuvwxyz01') + brand[i + 1:]
+            host = f"{rng.choice(['', 'www.', 'secure-'])}{typo}.{rng.choice(TLDS)}"
+        elif kind < 0.45:
+            host = '.'.join(str(rng.randrange(1, 255)) for _ in range(4))
+        elif kind < 0.50:
+            host = rng.choice(SHORTENERS)
+        else:
+            labels = [rng.choice(WORDS) for _ in range(rng.randrange(1, 4))]
+            host = '.'.join(
+                [f'sub{rng.randrange(100)}' for _ in range(rng.randrange(3))]
+                + ['-'.join(labels) + str(rng.randrange(1000)), rng.choice(TLDS)]
+            )
+        path = '/'.join(rng.choice(PATH_WORDS) for _ in range(rng.randrange(4)))
+        url = f'{rng.choice(SCHEMES)}://{host}/{path}'
+        if rng.random() < 0.3:
+            url += f'?id={rng.randrange(10 ** 6)}&token={rng.getrandbits(64):x}'
+        if rng.random() < 0.03:
+            url = url.replace('://', '://user@', 1)
+        if rng.random() < 0.03:
+            url += '//redirect'
+        urls.append(url)
+    return urls
+
+
+# ---------------------------------------------------------------------------
+# Pengukuran
+# ---------------------------------------------------------------------------
+
+def check_pipeline(urls, model):
+    """
+    Jalankan pipeline asli pada `urls` dan kembalikan daftar masalah (kosong jika sehat):
+    prediksi tidak valid, dict fitur bernilai fallback (exception yang ditelan
+    extract_url_features), probe error/timeout, atau probe yang tidak pernah mencapai server stub.
+    """
+    problems = []
+    failed_before = metrics.NETWORK_PROBES.total(outcome='error') + metrics.NETWORK_PROBES.total(outcome='timeout')
+    probe_values = {name: [] for name in url_features.NETWORK_PROBES}
+    for url in urls:
+        prediction, confidence = phishing_detector.predict_phishing_with_model(url, model)
+        if prediction is None or prediction not in model.classes_ or not 0.0 <= confidence <= 1.0:
+            problems.append(f'{url}: prediksi tidak valid ({prediction}, {confidence})')
+        features = url_features.extract_url_features(url)
+        if features.get('url_length') != len(url) or not features.get('domain_length'):
+            problems.append(f'{url}: extract_url_features mengembalikan fitur fallback')
+            continue
+        for name in url_features.NETWORK_PROBES:
+            if features[f'{name}_timed_out']:
+                problems.append(f'{url}: probe {name} timeout')
+            probe_values[name].append(features[name])
+    failed = (metrics.NETWORK_PROBES.total(outcome='error') + metrics.NETWORK_PROBES.total(outcome='timeout')
+              - failed_before)
+    if failed:
+        problems.append(f'{failed} probe jaringan error/timeout')
+    # Server stub memberi umur domain dan favicon 200 untuk sebagian besar host;
+    # jika semuanya 0, probe tidak mencapai stub (atau error-nya ditelan)
+    for name in ('domain_age', 'favicon_domain_match'):
+        if probe_values[name] and not any(probe_values[name]):
+            problems.append(f'probe {name} selalu 0 untuk semua URL warm-up')
+    return problems
+
+
+def time_traced(urls, func):
+    """
+    Panggil func(url) per URL di dalam satu trace; return {tahap: [durasi ns]} dengan tahap =
+    nama span yang dicatat aplikasi, dan 'total' = durasi seluruh panggilan. Span yang belum
+    selesai saat trace ditutup (probe melewati deadline) tidak dihitung.
+    """
+    timings = {}
+    for url in urls:
+        with tracing.trace('benchmark') as finished:
+            func(url)
+        for span in finished.spans:
+            if span.end is None:
+                continue
+            stage = 'total' if span is finished.root else span.name
+            timings.setdefault(stage, []).append(int((span.end - span.start) * 1e9))
+    return timings
+
+
+def time_end_to_end(urls, func, workers):
+    """Panggil func(url) untuk semua URL dengan `workers` thread; return (timings, wall detik)"""
+    def call(url):
+        start = time.perf_counter_ns()
+        func(url)
+        return time.perf_counter_ns() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        durations = list(pool.map(call, urls, chunksize=64))
+    return {'end_to_end': durations}, time.perf_counter() - start
+
+
+def summarize(durations_ns, wall_s=None):
+    """p50/p95/p99/mean (mikrodetik) dan throughput (URL/detik; dari wall time jika ada)"""
+    values = np.asarray(durations_ns, dtype=np.float64) / 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    elapsed = wall_s if wall_s is not None else values.sum() / 1e6
+    return {
+        'n': int(len(values)),
+        'p50_us': round(float(p50), 1),
+        'p95_us': round(float(p95), 1),
+        'p99_us': round(float(p99), 1),
+        'mean_us': round(float(values.mean()), 1),
+        'throughput_per_s': round(len(values) / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def run_dataset(urls, model, workers, cache_dir):
+    """Ukur semua tahap untuk satu daftar URL; return {grup.tahap: ringkasan}"""
+    results = {}
+    predict = lambda url: phishing_detector.predict_phishing_with_model(url, model)
+    for stage, durations in time_traced(urls, predict).items():
+        results[f'predict.{stage}'] = summarize(durations)
+    with fresh_whois_cache(cache_dir):
+        for stage, durations in time_traced(urls, url_features.extract_url_features).items():
+            results[f'url_features.{stage}'] = summarize(durations)
+    # End-to-end dengan cache WHOIS kosong lagi: setiap domain unik di-query sekali
+    with fresh_whois_cache(cache_dir):
+        timings, wall = time_end_to_end(urls, url_features.extract_url_features, workers)
+    results['url_features.end_to_end'] = summarize(timings['end_to_end'], wall)
+    timings, wall = time_end_to_end(urls, predict, workers)
+    results['predict.end_to_end'] = summarize(timings['end_to_end'], wall)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Daftar (dataset, tahap, metrik, baseline, sekarang, rasio) yang melambat melebihi toleransi"""
+    regressions = []
+    for dataset, stages in results['datasets'].items():
+        base_stages = baseline.get('datasets', {}).get(dataset, {}).get('stages', {})
+        for stage, summary in stages['stages'].items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            for metric in ('p50_us', 'p95_us'):
+                if (base[metric] and summary[metric] > base[metric] * (1 + tolerance)
+                        and summary[metric] - base[metric] >= MIN_REGRESSION_US):
+                    regressions.append((dataset, stage, metric, base[metric], summary[metric],
+                                        round(summary[metric] / base[metric], 2)))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark latensi pipeline phishing URL (server stub lokal)')
+    parser.add_argument('--dataset', action='append', choices=['blackbox', 'synthetic'],
+                        help='Dataset tertentu saja (default: keduanya)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Pengulangan 10 URL blackbox')
+    parser.add_argument('--corpus-size', type=int, default=DEFAULT_CORPUS_SIZE, help='Jumlah URL sintetis')
+    parser.add_argument('--seed', type=int, default=42, help='Seed korpus sintetis')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Thread untuk pass end-to-end')
+    parser.add_argument('--http-latency-ms', type=float, default=0.0, help='Latensi tambahan server HTTP stub')
+    parser.add_argument('--whois-latency-ms', type=float, default=0.0, help='Latensi tambahan server WHOIS stub')
+    parser.add_argument('--model', help='Direktori artefak model atau file .pkl (default: model aplikasi)')
+    parser.add_argument('--json', help='Simpan hasil ke file JSON (key terurut, bisa di-diff)')
+    parser.add_argument('--compare', help='File JSON hasil sebelumnya sebagai baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Batas perlambatan relatif p50/p95 sebelum dianggap regresi')
+    args = parser.parse_args(argv)
+
+    model = phishing_detector.load_model(args.model)
+    # Trace hanya dipakai untuk mengukur; jangan ikut mengukur ring buffer / log JSON
+    tracing.set_exporters([])
+    datasets = {}
+    for name in args.dataset or ['blackbox', 'synthetic']:
+        if name == 'blackbox':
+            datasets[name] = read_blackbox_urls() * args.repeat
+        else:
+            datasets[name] = synthetic_urls(args.corpus_size, args.seed)
+
+    results = {
+        'meta': {
+            'commit': _git_commit(),
+            'model': phishing_detector.model_fingerprint(args.model)[:16],
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+        },
+        'parameters': {
+            'repeat': args.repeat,
+            'corpus_size': args.corpus_size,
+            'seed': args.seed,
+            'workers': args.workers,
+            'http_latency_ms': args.http_latency_ms,
+            'whois_latency_ms': args.whois_latency_ms,
+        },
+        'datasets': {},
+    }
+
+    with tempfile.TemporaryDirectory() as cache_dir, \
+            stub_network(args.http_latency_ms / 1000, args.whois_latency_ms / 1000):
+        # Warm-up (load lazy tldextract, allowlist, typosquat, requests di luar pengukuran)
+        # sekaligus cek bahwa pipeline menghasilkan nilai yang benar
+        with fresh_whois_cache(cache_dir):
+            problems = check_pipeline(read_blackbox_urls(), model)
+        if problems:
+            print('Pipeline tidak sehat, benchmark dibatalkan:', file=sys.stderr)
+            for problem in problems:
+                print(f'    {problem}', file=sys.stderr)
+            sys.exit(1)
+        for name, urls in datasets.items():
+            print(f'{name}: {len(urls)} URL...', flush=True)
+            results['datasets'][name] = {'n_urls': len(urls), 'stages': run_dataset(urls, model, args.workers, cache_dir)}
+
+    for name, dataset in results['datasets'].items():
+        print(f'\n{name} ({dataset["n_urls"]} URL)')
+        print(f'    {"tahap":36} {"p50 us":>10} {"p95 us":>10} {"p99 us":>10} {"URL/s":>10}')
+        for stage, s in sorted(dataset['stages'].items()):
+            print(f'    {stage:36} {s["p50_us"]:10.1f} {s["p95_us"]:10.1f} {s["p99_us"]:10.1f} '
+                  f'{s["throughput_per_s"] or 0:10.1f}')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f'\nRegresi (> {args.tolerance:.0%} lebih lambat dari {args.compare}):')
+            for dataset, stage, metric, before, after, ratio in regressions:
+                print(f'    {dataset} {stage} {metric}: {before} -> {after} ({ratio}x)')
+            sys.exit(1)
+        print(f'\nTidak ada regresi dibanding {args.compare}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,55 +1,230 @@
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, accuracy_score
-import pickle
+"""
+Training model phishing (RandomForest) dengan pencarian hyperparameter.
+
+- Grid search jumlah tree x kedalaman maksimum, cross-validation paralel (n_jobs)
+- Setiap kandidat diukur latensi scoring per URL dengan engine NumPy terkompilasi
+- Kandidat dipilih dari Pareto front akurasi vs latensi: kandidat tercepat yang akurasinya
+  masih dalam toleransi dari akurasi terbaik
+- Hasil: phishing_model.pkl, artefak model phishing_model/ (metadata berisi hyperparameter
+  dan hasil evaluasi), serta laporan pencarian JSON (opsional)
+
+Contoh:
+    python model/train_phishing_model.py
+    python model/train_phishing_model.py --n-estimators 25 50 100 --max-depth 10 16 none --n-jobs 4
+"""
+import argparse
+import json
 import os
+import pickle
 import sys
-# Tambahkan path absolut ke utils agar url_features bisa diimpor
-sys.path.append(os.path.join(os.path.dirname(__file__), '../utils'))
-from url_features import is_typo_domain
-
-# Path dataset dan model
-DATA_PATH = 'data/phishing_dataset.csv'
-MODEL_PATH = 'phishing_model.pkl'
-
-# Baca dataset
-print('Membaca dataset...')
-df = pd.read_csv(DATA_PATH)
-print('Jumlah data:', len(df))
-
-# Tambahkan fitur is_typo_domain
-print('Menambahkan fitur is_typo_domain...')
-if 'is_typo_domain' not in df.columns:
-    # Asumsi domain ada di kolom 'index', 'Result', sisanya fitur
-    # Kita ekstrak domain dari URL jika ada kolom URL, jika tidak, dari fitur domain
-    if 'url' in df.columns:
-        import tldextract
-        df['is_typo_domain'] = df['url'].apply(lambda x: is_typo_domain(tldextract.extract(x).domain))
-    elif 'having_IPhaving_IP_Address' in df.columns:
-        # Asumsi domain ada di kolom index, tidak ada kolom url, skip (atau bisa diisi 0)
-        df['is_typo_domain'] = 0
-    else:
-        df['is_typo_domain'] = 0
-
-# Pisahkan fitur dan label
-y = df['Result']
-X = df.drop(['index', 'Result'], axis=1)
-
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Training model
-print('Training Random Forest...')
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
-
-# Evaluasi
-y_pred = model.predict(X_test)
-print('Akurasi:', accuracy_score(y_test, y_pred))
-print(classification_report(y_test, y_pred))
-
-# Simpan model
-with open(MODEL_PATH, 'wb') as f:
-    pickle.dump(model, f)
-print(f'Model disimpan ke {MODEL_PATH}') 
\ No newline at end of file
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import classification_report, accuracy_score
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# Tambahkan path absolut ke utils agar modul fitur & engine bisa diimpor
+sys.path.append(os.path.join(PROJECT_DIR, 'utils'))
+from forest_engine import compile_forest, export_forest
+from feature_pipeline import FEATURE_COLUMNS, load_training_features
+
+# Path dataset dan model (absolut, tidak bergantung direktori kerja)
+DATA_PATH = os.path.join(PROJECT_DIR, 'data', 'phishing_dataset.csv')
+MODEL_PATH = os.path.join(PROJECT_DIR, 'phishing_model.pkl')
+MODEL_ARTIFACT_PATH = os.path.join(PROJECT_DIR, 'phishing_model')
+
+RANDOM_STATE = 42
+DEFAULT_N_ESTIMATORS = [25, 50, 100, 200]
+DEFAULT_MAX_DEPTH = [8, 12, 16, None]
+# Kandidat dengan akurasi CV dalam toleransi ini dari yang terbaik dianggap setara
+DEFAULT_ACCURACY_TOLERANCE = 0.005
+LATENCY_SAMPLES = 200
+
+
+def load_dataset(path=DATA_PATH, use_cache=True):
+    """Baca dataset lewat pipeline fitur bersama; return (X dengan kolom FEATURE_COLUMNS, y)"""
+    print('Membaca dataset dan menghitung fitur...')
+    X, y, cache_hit = load_training_features(path, use_cache=use_cache)
+    print('Jumlah data:', len(X), '(matriks fitur dari cache)' if cache_hit else '')
+    return X, y
+
+
+def search_hyperparameters(X_train, y_train, n_estimators, max_depths, cv=5, n_jobs=-1,
+                           random_state=RANDOM_STATE):
+    """Grid search dengan StratifiedKFold; return list kandidat (params, akurasi CV rata-rata & std)"""
+    grid = GridSearchCV(
+        RandomForestClassifier(random_state=random_state),
+        {'n_estimators': n_estimators, 'max_depth': max_depths},
+        scoring='accuracy',
+        cv=StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state),
+        n_jobs=n_jobs,
+        refit=False,
+    )
+    grid.fit(X_train, y_train)
+    results = grid.cv_results_
+    return [
+        {
+            'params': dict(params),
+            'cv_accuracy': float(results['mean_test_score'][i]),
+            'cv_accuracy_std': float(results['std_test_score'][i]),
+        }
+        for i, params in enumerate(results['params'])
+    ]
+
+
+def measure_latency(model, X_sample):
+    """Latensi scoring satu URL (ms) dengan engine terkompilasi: p50 & p95 atas baris sampel"""
+    compiled = compile_forest(model, FEATURE_COLUMNS)
+    rows = np.ascontiguousarray(X_sample, dtype=np.float32)
+    compiled.predict_proba(rows[:1])  # warm-up
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        compiled.predict_proba(row[None, :])
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'latency_p50_ms': float(np.percentile(timings, 50)),
+        'latency_p95_ms': float(np.percentile(timings, 95)),
+        'n_nodes': int(len(compiled.left)),
+    }
+
+
+def pareto_front(candidates):
+    """Kandidat yang tidak didominasi (akurasi lebih tinggi/sama DAN latensi lebih rendah/sama)"""
+    front = []
+    for c in candidates:
+        dominated = any(
+            o['cv_accuracy'] >= c['cv_accuracy'] and o['latency_p50_ms'] <= c['latency_p50_ms']
+            and (o['cv_accuracy'] > c['cv_accuracy'] or o['latency_p50_ms'] < c['latency_p50_ms'])
+            for o in candidates
+        )
+        if not dominated:
+            front.append(c)
+    return sorted(front, key=lambda c: c['latency_p50_ms'])
+
+
+def select_candidate(front, tolerance=DEFAULT_ACCURACY_TOLERANCE):
+    """Kandidat tercepat di Pareto front yang akurasinya dalam `tolerance` dari yang terbaik"""
+    best_accuracy = max(c['cv_accuracy'] for c in front)
+    eligible = [c for c in front if c['cv_accuracy'] >= best_accuracy - tolerance]
+    return min(eligible, key=lambda c: (c['latency_p50_ms'], -c['cv_accuracy']))
+
+
+def train(data_path=DATA_PATH, n_estimators=None, max_depths=None, cv=5, n_jobs=-1,
+          test_size=0.2, random_state=RANDOM_STATE, tolerance=DEFAULT_ACCURACY_TOLERANCE,
+          latency_samples=LATENCY_SAMPLES, use_cache=True):
+    """
+    Jalankan pencarian hyperparameter dan latih model final.
+    Return (model, laporan) — laporan berisi semua kandidat, Pareto front, dan evaluasi test.
+    """
+    n_estimators = n_estimators or DEFAULT_N_ESTIMATORS
+    max_depths = max_depths or DEFAULT_MAX_DEPTH
+    X, y = load_dataset(data_path, use_cache)
+
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state, stratify=y
+    )
+
+    print(f'Grid search {len(n_estimators) * len(max_depths)} kandidat, {cv}-fold CV, n_jobs={n_jobs}...')
+    candidates = search_hyperparameters(X_train, y_train, n_estimators, max_depths, cv, n_jobs, random_state)
+
+    # Latensi diukur pada model yang dilatih penuh di data train (ukuran forest = ukuran produksi)
+    X_sample = X_test.to_numpy()[:latency_samples]
+    for candidate in candidates:
+        model = RandomForestClassifier(random_state=random_state, n_jobs=n_jobs, **candidate['params'])
+        model.fit(X_train, y_train)
+        candidate.update(measure_latency(model, X_sample))
+        print(f"  {candidate['params']}: akurasi CV {candidate['cv_accuracy']:.4f}, "
+              f"p50 {candidate['latency_p50_ms']:.3f} ms, {candidate['n_nodes']} node")
+
+    front = pareto_front(candidates)
+    selected = select_candidate(front, tolerance)
+    print('Pareto front:', [c['params'] for c in front])
+    print('Dipilih:', selected['params'])
+
+    # Training model final
+    print('Training Random Forest final...')
+    model = RandomForestClassifier(random_state=random_state, n_jobs=n_jobs, **selected['params'])
+    model.fit(X_train, y_train)
+    # n_jobs tidak ikut disimpan agar scoring di app tidak membuat thread pool joblib
+    model.n_jobs = None
+
+    # Evaluasi
+    y_pred = model.predict(X_test)
+    test_accuracy = accuracy_score(y_test, y_pred)
+    print('Akurasi:', test_accuracy)
+    print(classification_report(y_test, y_pred))
+
+    report = {
+        'random_state': random_state,
+        'test_size': test_size,
+        'cv_folds': cv,
+        'accuracy_tolerance': tolerance,
+        'selected': selected,
+        'test_accuracy': float(test_accuracy),
+        'pareto_front': front,
+        'candidates': candidates,
+    }
+    return model, report
+
+
+def save_model(model, report, data_path=DATA_PATH, model_path=MODEL_PATH, artifact_path=MODEL_ARTIFACT_PATH):
+    # Simpan model
+    with open(model_path, 'wb') as f:
+        pickle.dump(model, f)
+    print(f'Model disimpan ke {model_path}')
+
+    # Ekspor forest ke artefak model (metadata.json + array .npy) agar app bisa scoring tanpa sklearn
+    training_info = {
+        'params': report['selected']['params'],
+        'cv_accuracy': report['selected']['cv_accuracy'],
+        'test_accuracy': report['test_accuracy'],
+        'latency_p50_ms': report['selected']['latency_p50_ms'],
+        'random_state': report['random_state'],
+    }
+    export_forest(model, artifact_path, feature_names=FEATURE_COLUMNS, training_data=data_path,
+                  training_info=training_info)
+    print(f'Artefak model disimpan ke {artifact_path}')
+    print('Model ringkas lama dihapus; jalankan python utils/compact_scorer.py untuk distilasi ulang')
+
+
+def parse_max_depth(value):
+    return None if value.lower() == 'none' else int(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Training model phishing dengan pencarian hyperparameter')
+    parser.add_argument('--data', default=DATA_PATH, help='Dataset CSV')
+    parser.add_argument('--model-output', default=MODEL_PATH, help='Path model pickle')
+    parser.add_argument('--artifact-output', default=MODEL_ARTIFACT_PATH, help='Direktori artefak model')
+    parser.add_argument('--n-estimators', type=int, nargs='+', default=DEFAULT_N_ESTIMATORS)
+    parser.add_argument('--max-depth', type=parse_max_depth, nargs='+', default=DEFAULT_MAX_DEPTH,
+                        help="Kedalaman maksimum ('none' = tanpa batas)")
+    parser.add_argument('--cv', type=int, default=5, help='Jumlah fold cross-validation')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Jumlah proses paralel (-1 = semua core)')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--random-state', type=int, default=RANDOM_STATE)
+    parser.add_argument('--accuracy-tolerance', type=float, default=DEFAULT_ACCURACY_TOLERANCE)
+    parser.add_argument('--latency-samples', type=int, default=LATENCY_SAMPLES,
+                        help='Jumlah URL test untuk mengukur latensi per kandidat')
+    parser.add_argument('--report', help='Simpan laporan pencarian (semua kandidat) ke file JSON')
+    parser.add_argument('--no-feature-cache', action='store_true', help='Hitung ulang matriks fitur tanpa cache')
+    args = parser.parse_args(argv)
+
+    model, report = train(
+        args.data, args.n_estimators, args.max_depth, args.cv, args.n_jobs,
+        args.test_size, args.random_state, args.accuracy_tolerance, args.latency_samples,
+        not args.no_feature_cache,
+    )
+    save_model(model, report, args.data, args.model_output, args.artifact_output)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f'Laporan pencarian disimpan ke {args.report}')
+
+
+if __name__ == '__main__':
+    main()
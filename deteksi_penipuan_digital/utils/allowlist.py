@@ -0,0 +1,124 @@
+import logging
+import os
+import threading
+from canonical_url import canonical_host
+
+logger = logging.getLogger(__name__)
+
+ALLOWLIST_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'allowlist_domains.txt')
+# Daftar tambahan opsional (misalnya top-sites 1 juta domain), dimuat jika file ada
+EXTRA_ALLOWLIST_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'allowlist_top_sites.txt')
+
+# Penanda node trie: leaf tanpa anak disimpan sebagai _END (bukan dict) agar hemat memori,
+# node dengan anak yang juga merupakan entri menyimpan key _TERMINAL
+_END = object()
+_TERMINAL = ''
+
+
+class AllowlistIndex:
+    """
+    Index allowlist domain: frozenset untuk exact match dan trie label terbalik
+    (com -> google -> www) untuk menjawab "apakah host ini atau parent domain-nya
+    ada di allowlist" dalam O(jumlah label).
+    """
+
+    def __init__(self, domains=(), version=''):
+        self.domains = frozenset(filter(None, map(canonical_host, domains)))
+        # Identitas file sumber (lihat load_allowlist), ikut generation verdict cache
+        self.version = version
+        self._trie = {}
+        for domain in self.domains:
+            self._insert(domain)
+
+    def _insert(self, domain):
+        node = self._trie
+        labels = domain.split('.')[::-1]
+        for i, label in enumerate(labels):
+            last = i == len(labels) - 1
+            child = node.get(label)
+            if last:
+                if child is None:
+                    node[label] = _END
+                elif child is not _END:
+                    child[_TERMINAL] = True
+                return
+            if child is None:
+                child = node[label] = {}
+            elif child is _END:
+                # Entri yang lebih pendek sudah ada, semua subdomain otomatis tercakup
+                return
+            node = child
+
+    def __len__(self):
+        return len(self.domains)
+
+    def __contains__(self, host):
+        return self.contains(host)
+
+    def contains(self, host):
+        """True jika host sama dengan, atau subdomain dari, salah satu entri allowlist"""
+        host = canonical_host(host)
+        if not host:
+            return False
+        if host in self.domains:
+            return True
+        node = self._trie
+        for label in reversed(host.split('.')):
+            child = node.get(label)
+            if child is None:
+                return False
+            if child is _END or _TERMINAL in child:
+                return True
+            node = child
+        return False
+
+
+def read_domains(path):
+    """Baca domain dari file teks (satu per baris, '#' komentar, format 'rank,domain' diterima)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            yield line.rsplit(',', 1)[-1]
+
+
+def is_public_suffix(domain):
+    """True jika domain adalah public suffix ICANN (misalnya ac.id, go.id, co.id), bukan domain terdaftar"""
+    from public_suffix import extract
+    extracted = extract(domain)
+    return bool(extracted.suffix) and not extracted.domain
+
+
+def load_allowlist(*paths):
+    """
+    Entri yang berupa public suffix ditolak: karena entri berlaku untuk semua subdomain,
+    "go.id" akan meloloskan domain apa pun di bawahnya (evil.go.id) tanpa lewat model.
+    Suffix pendidikan/pemerintah ditangani aturan terpisah di view.
+    """
+    domains = []
+    sources = []
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            sources.append(f'{os.path.basename(path)}:{stat.st_mtime_ns}:{stat.st_size}')
+            for domain in read_domains(path):
+                if is_public_suffix(domain):
+                    logger.warning('Entri allowlist %r adalah public suffix, dilewati', domain)
+                    continue
+                domains.append(domain)
+    return AllowlistIndex(domains, ','.join(sources))
+
+
+_allowlist = None
+_allowlist_lock = threading.Lock()
+
+
+def get_allowlist():
+    """Index allowlist level modul, dibangun sekali per proses saat pertama dipakai"""
+    global _allowlist
+    if _allowlist is None:
+        with _allowlist_lock:
+            if _allowlist is None:
+                _allowlist = load_allowlist(ALLOWLIST_FILE, EXTRA_ALLOWLIST_FILE)
+    return _allowlist
@@ -0,0 +1,143 @@
+"""
+Batch scanning URL phishing tanpa Streamlit.
+
+Contoh CLI:
+    python utils/batch_scan.py proxy_urls.txt -o hasil.jsonl
+    python utils/batch_scan.py phishing_urls_for_blackbox_testing.csv --column URL
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import phishing_detector
+from phishing_detector import (
+    extract_model_features_frame, is_whitelisted, apply_guardrail_frame, apply_url_rules, score_rows
+)
+from blocklist import is_reported_url
+from url_features import extract_url_features
+from url_parse import parse_url
+
+DEFAULT_CHUNK_SIZE = 1000
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _result(url, prediction, confidence, whitelisted=False):
+    return {
+        'url': url,
+        'prediction': None if prediction is None else int(prediction),
+        'is_phishing': prediction is not None and int(prediction) == 1,
+        'confidence': round(float(confidence), 4),
+        'whitelisted': whitelisted,
+    }
+
+def _is_reported(parsed):
+    try:
+        return is_reported_url(parsed.canonical)
+    except Exception:
+        return False
+
+def finalize_result(result, parsed):
+    """
+    Langkah setelah model yang sama dengan UI: aturan akademik/pemerintah & judi (dengan fitur
+    URL tanpa probe jaringan), lalu override laporan pengguna / blocklist
+    """
+    features = extract_url_features(parsed.url, parsed, network=False)
+    prediction, confidence = apply_url_rules(result['prediction'], result['confidence'], parsed, features)
+    reported = _is_reported(parsed)
+    if reported:
+        prediction, confidence = 1, 0.95
+    result.update(prediction=int(prediction), is_phishing=int(prediction) == 1,
+                  confidence=round(float(confidence), 4), reported=reported)
+    return result
+
+def scan_chunk(urls, model):
+    """
+    Scan satu chunk URL: ekstraksi fitur kolumnar, lalu satu predict_proba untuk seluruh chunk.
+    URL yang tidak bisa di-parse mendapat {'url', 'error'} tanpa menghentikan chunk.
+    """
+    results = [None] * len(urls)
+    parsed_urls = [None] * len(urls)
+    pending_index = []
+
+    for i, url in enumerate(urls):
+        try:
+            parsed = parsed_urls[i] = parse_url(url)
+        except ValueError as e:
+            results[i] = {'url': url, 'error': f'URL tidak valid: {e}'}
+            continue
+        if is_whitelisted(url, parsed):
+            results[i] = _result(url, 0, 0.95, whitelisted=True)
+        else:
+            pending_index.append(i)
+
+    if pending_index:
+        features = extract_model_features_frame(
+            [urls[i] for i in pending_index], [parsed_urls[i] for i in pending_index]
+        )
+        labels, confidences = score_rows(model, features.to_numpy(dtype=np.float32))
+        predictions, confidences = apply_guardrail_frame(labels, confidences, features)
+        for i, prediction, confidence in zip(pending_index, predictions, confidences):
+            results[i] = _result(urls[i], prediction, confidence)
+
+    for i, parsed in enumerate(parsed_urls):
+        if parsed is not None:
+            finalize_result(results[i], parsed)
+    return results
+
+def scan_urls(urls, model=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Scan iterable URL secara streaming dan yield satu dict hasil per URL (urutan input dipertahankan).
+    URL kosong dilewati. Model dimuat dengan load_model() jika tidak diberikan.
+    """
+    if model is None:
+        model = phishing_detector.load_model()
+    cleaned = (u.strip() for u in urls if u and u.strip())
+    for chunk in _chunks(cleaned, chunk_size):
+        yield from scan_chunk(chunk, model)
+
+def read_urls(path, column=None):
+    """Baca URL secara streaming dari file CSV (kolom url/URL) atau file teks satu URL per baris"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.csv'):
+            reader = csv.DictReader(f)
+            if column is None:
+                fields = reader.fieldnames or []
+                column = next((c for c in ('url', 'URL') if c in fields), fields[0] if fields else None)
+            for row in reader:
+                yield row.get(column) or ''
+        else:
+            for line in f:
+                yield line.strip()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch scan URL phishing ke JSONL')
+    parser.add_argument('input', help='File CSV atau file teks berisi satu URL per baris')
+    parser.add_argument('-o', '--output', help='File output JSONL (default: stdout)')
+    parser.add_argument('--column', help='Nama kolom URL pada CSV (default: url/URL)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--model', help='Path model phishing (direktori artefak model atau .pkl)')
+    args = parser.parse_args(argv)
+
+    model = phishing_detector.load_model(args.model)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for result in scan_urls(read_urls(args.input, args.column), model, args.chunk_size):
+            out.write(json.dumps(result) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == '__main__':
+    main()
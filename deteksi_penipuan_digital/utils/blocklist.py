@@ -0,0 +1,221 @@
+"""
+Blocklist phishing berukuran besar (feed OpenPhish/PhishTank + laporan pengguna).
+
+Dibangun offline menjadi dua file yang di-memory-map saat runtime:
+- blocklist.bloom : Bloom filter (prefilter, ~1.2 byte per entri pada FPR 1%)
+- blocklist.keys  : fingerprint 64-bit terurut untuk konfirmasi (binary search)
+
+Contoh build:
+    python utils/blocklist.py --feed openphish.txt --feed phishtank.csv
+"""
+import argparse
+import csv
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from report_store import ReportStore, report_key, get_report_store, LEGACY_REPORT_FILE, REPORT_DB_FILE
+from canonical_url import canonical_host
+
+BLOCKLIST_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+BLOOM_FILENAME = 'blocklist.bloom'
+KEYS_FILENAME = 'blocklist.keys'
+
+BLOOM_MAGIC = b'BLM1'
+BLOOM_HEADER = struct.Struct('<4sQI')  # magic, jumlah bit, jumlah hash
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+BUILD_CHUNK_SIZE = 1_000_000
+
+
+def _hash_pair(entry):
+    """Dua hash 64-bit stabil (antar proses) untuk sebuah entri"""
+    digest = hashlib.blake2b(entry.encode('utf-8'), digest_size=16).digest()
+    return struct.unpack('<QQ', digest)
+
+
+def url_entry(url):
+    return 'u:' + report_key(url)
+
+
+def host_entry(host):
+    return 'h:' + canonical_host(host)
+
+
+class Blocklist:
+    """
+    Lookup blocklist dari file hasil build_blocklist.
+
+    Bloom filter menolak sebagian besar URL bersih tanpa menyentuh array kunci;
+    kandidat positif dikonfirmasi lewat binary search pada fingerprint 64-bit
+    (peluang tabrakan ~N / 2^64, praktis exact).
+    """
+
+    def __init__(self, directory=BLOCKLIST_DIR):
+        self.directory = directory
+        bloom_path = os.path.join(directory, BLOOM_FILENAME)
+        keys_path = os.path.join(directory, KEYS_FILENAME)
+        self._bloom = None
+        self._keys = np.zeros(0, dtype='<u8')
+        self.num_bits = 0
+        self.num_hashes = 0
+        # mtime & ukuran file saat dibuka; berubah setiap build ulang (ikut generation verdict cache)
+        self.version = ','.join(
+            f'{os.stat(p).st_mtime_ns}:{os.stat(p).st_size}' if os.path.exists(p) else '-'
+            for p in (bloom_path, keys_path)
+        )
+        if os.path.exists(bloom_path) and os.path.getsize(bloom_path) > BLOOM_HEADER.size:
+            with open(bloom_path, 'rb') as f:
+                self._bloom = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.num_bits, self.num_hashes = BLOOM_HEADER.unpack_from(self._bloom, 0)
+            if magic != BLOOM_MAGIC:
+                raise ValueError(f'Format file Bloom filter tidak dikenal: {bloom_path}')
+        if os.path.exists(keys_path) and os.path.getsize(keys_path) > 0:
+            self._keys = np.memmap(keys_path, dtype='<u8', mode='r')
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _might_contain(self, h1, h2):
+        bloom = self._bloom
+        offset = BLOOM_HEADER.size
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % self.num_bits
+            if not bloom[offset + (bit >> 3)] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def contains_entry(self, entry):
+        if self._bloom is None or not len(self._keys):
+            return False
+        h1, h2 = _hash_pair(entry)
+        if not self._might_contain(h1, h2):
+            return False
+        position = np.searchsorted(self._keys, np.uint64(h1))
+        return position < len(self._keys) and int(self._keys[position]) == h1
+
+    def contains_url(self, url):
+        return self.contains_entry(url_entry(url))
+
+    def contains_host(self, host):
+        return bool(host) and self.contains_entry(host_entry(host))
+
+
+def iter_feed_entries(path):
+    """
+    Entri dari file feed: CSV (kolom url, misalnya dump PhishTank) atau teks satu per baris
+    (misalnya OpenPhish). Baris tanpa '/' dianggap host, sisanya URL.
+    """
+    with open(path, newline='', encoding='utf-8', errors='replace') as f:
+        if path.lower().endswith('.csv'):
+            reader = csv.DictReader(f)
+            fields = reader.fieldnames or []
+            column = next((c for c in ('url', 'URL') if c in fields), fields[0] if fields else None)
+            values = (row.get(column) or '' for row in reader)
+        else:
+            values = (line.split('#', 1)[0] for line in f)
+        for value in values:
+            value = value.strip()
+            if not value:
+                continue
+            yield url_entry(value) if '/' in value else host_entry(value)
+
+
+def iter_report_entries():
+    """Entri URL dari laporan pengguna (database SQLite, atau file JSON lama)"""
+    if os.path.exists(REPORT_DB_FILE) or os.path.exists(LEGACY_REPORT_FILE):
+        for key in ReportStore().keys():
+            yield url_entry(key)
+
+
+def build_blocklist(entries, directory=BLOCKLIST_DIR, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+    """Bangun file Bloom filter + kunci terurut dari iterable entri (streaming per chunk)"""
+    h1_chunks, h2_chunks = [], []
+    chunk_h1, chunk_h2 = [], []
+    for entry in entries:
+        h1, h2 = _hash_pair(entry)
+        chunk_h1.append(h1)
+        chunk_h2.append(h2)
+        if len(chunk_h1) >= BUILD_CHUNK_SIZE:
+            h1_chunks.append(np.array(chunk_h1, dtype=np.uint64))
+            h2_chunks.append(np.array(chunk_h2, dtype=np.uint64))
+            chunk_h1, chunk_h2 = [], []
+    h1_chunks.append(np.array(chunk_h1, dtype=np.uint64))
+    h2_chunks.append(np.array(chunk_h2, dtype=np.uint64))
+
+    all_h1 = np.concatenate(h1_chunks)
+    all_h2 = np.concatenate(h2_chunks)
+    keys, first_index = np.unique(all_h1, return_index=True)
+    all_h2 = all_h2[first_index]
+    count = max(len(keys), 1)
+
+    num_bits = max(64, int(math.ceil(-count * math.log(false_positive_rate) / (math.log(2) ** 2))))
+    num_hashes = max(1, int(round(num_bits / count * math.log(2))))
+    bits = np.zeros(num_bits, dtype=bool)
+    modulus = np.uint64(num_bits)
+    for start in range(0, len(keys), BUILD_CHUNK_SIZE):
+        h1 = keys[start:start + BUILD_CHUNK_SIZE] % modulus
+        h2 = all_h2[start:start + BUILD_CHUNK_SIZE] % modulus
+        for i in range(num_hashes):
+            # (h1 + i*h2) mod m, dihitung dalam modulo agar tidak overflow uint64
+            bits[(h1 + (np.uint64(i) * h2) % modulus) % modulus] = True
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, BLOOM_FILENAME), 'wb') as f:
+        f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, num_bits, num_hashes))
+        f.write(np.packbits(bits, bitorder='little').tobytes())
+    keys.astype('<u8').tofile(os.path.join(directory, KEYS_FILENAME))
+    return len(keys)
+
+
+_blocklist = None
+_blocklist_lock = threading.Lock()
+
+
+def get_blocklist():
+    """Blocklist level modul (memory-mapped), dibuka sekali per proses"""
+    global _blocklist
+    if _blocklist is None:
+        with _blocklist_lock:
+            if _blocklist is None:
+                _blocklist = Blocklist()
+    return _blocklist
+
+
+def is_reported_url(canonical):
+    """
+    Cek URL kanonik (canonical_url.CanonicalURL) di laporan pengguna, lalu di blocklist
+    feed besar (Bloom filter) untuk URL & host-nya
+    """
+    if get_report_store().contains(canonical.url):
+        return True
+    blocklist = get_blocklist()
+    return blocklist.contains_url(canonical.url) or blocklist.contains_host(canonical.host_key)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build blocklist phishing (Bloom filter + kunci terurut)')
+    parser.add_argument('--feed', action='append', default=[], help='File feed URL/host (boleh lebih dari satu)')
+    parser.add_argument('--output-dir', default=BLOCKLIST_DIR)
+    parser.add_argument('--fpr', type=float, default=DEFAULT_FALSE_POSITIVE_RATE, help='Target false positive rate Bloom filter')
+    parser.add_argument('--no-reports', action='store_true', help='Jangan sertakan laporan pengguna')
+    args = parser.parse_args(argv)
+
+    def entries():
+        if not args.no_reports:
+            yield from iter_report_entries()
+        for path in args.feed:
+            yield from iter_feed_entries(path)
+
+    count = build_blocklist(entries(), args.output_dir, args.fpr)
+    print(f'Blocklist berisi {count} entri disimpan ke {args.output_dir}')
+
+
+if __name__ == '__main__':
+    main()
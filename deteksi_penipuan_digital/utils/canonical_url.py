@@ -0,0 +1,91 @@
+import re
+import string
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from public_suffix import extract, registered_domain
+
+# url        : URL kanonik (kunci laporan dan blocklist URL)
+# host_key   : hostname kanonik tanpa "www." (kunci allowlist & blocklist host)
+# domain_key : registered domain, misalnya example.co.id (kunci cache WHOIS)
+CanonicalURL = namedtuple('CanonicalURL', ['url', 'host_key', 'domain_key'])
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+UNRESERVED = frozenset(string.ascii_letters + string.digits + '-._~')
+_PERCENT_RE = re.compile(r'%([0-9A-Fa-f]{2})')
+
+
+def _normalize_percent(text):
+    """Decode escape untuk karakter unreserved (%41 -> A), sisanya jadi hex huruf besar"""
+    def replace(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in UNRESERVED else '%' + match.group(1).upper()
+    return _PERCENT_RE.sub(replace, text)
+
+
+def _normalize_path(path):
+    """Normalisasi percent-encoding, buang segmen '.'/'..', dan slash penutup"""
+    segments = []
+    for segment in _normalize_percent(path).split('/'):
+        if segment == '.':
+            continue
+        if segment == '..':
+            if segments:
+                segments.pop()
+            continue
+        segments.append(segment)
+    path = '/'.join(segments)
+    path = path.rstrip('/')
+    if path and not path.startswith('/'):
+        path = '/' + path
+    return path
+
+
+def _normalize_query(query):
+    """Urutkan parameter query agar urutan parameter tidak menghasilkan kunci berbeda"""
+    params = [_normalize_percent(p) for p in query.split('&') if p]
+    return '&'.join(sorted(params))
+
+
+def canonical_host(host):
+    """Hostname lowercase, IDN dalam bentuk punycode, tanpa titik penutup dan tanpa 'www.'"""
+    host = (host or '').strip().lower().rstrip('.')
+    try:
+        host = host.encode('idna').decode('ascii')
+    except UnicodeError:
+        pass
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+def canonicalize(url, extracted=None):
+    """
+    Bentuk kanonik sebuah URL untuk semua cache dan index:
+    scheme & host lowercase, tanpa www., tanpa port default, percent-encoding
+    dinormalisasi, tanpa slash penutup, parameter query terurut, tanpa fragment
+    dan userinfo. `extracted` (hasil public_suffix.extract) dipakai ulang jika sudah ada.
+    """
+    url = url.strip()
+    if '://' not in url:
+        url = 'http://' + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = canonical_host(parts.hostname)
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+
+    netloc = host
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{host}:{port}'
+    canonical = f'{scheme}://{netloc}{_normalize_path(parts.path)}'
+    query = _normalize_query(parts.query)
+    if query:
+        canonical += '?' + query
+
+    if extracted is None:
+        extracted = extract(host)
+    domain_key = canonical_host(registered_domain(extracted))
+    return CanonicalURL(canonical, host, domain_key)
@@ -0,0 +1,187 @@
+"""
+Model ringkas hasil distilasi forest phishing untuk jalur cepat.
+
+Semua fitur model bernilai diskrit -1/0/1, sehingga model logistik atas one-hot fitur
+bisa di-compile menjadi tabel bobot (n_fitur x 3) + bias: scoring satu URL hanya
+31 lookup dan satu sigmoid. CascadeModel memakai model ringkas untuk kasus yang
+yakin dan hanya menjalankan forest penuh untuk kasus yang ragu.
+
+Contoh distilasi dari artefak model yang sudah ada:
+    python utils/compact_scorer.py
+
+Cascade bersifat opt-in: load_model hanya memakainya jika env DETEKSI_CASCADE=1, karena
+akurasinya sedikit di bawah forest penuh (lihat cascade_accuracy vs forest_accuracy di metadata).
+
+Metadata model ringkas mencatat hash metadata.json forest asalnya (forest_metadata_sha256);
+load_model tidak memakai cascade jika forest sudah diganti. export_forest menghapus
+model ringkas lama, jadi jalankan distilasi ulang setiap kali model dilatih ulang.
+"""
+import json
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from forest_engine import MODEL_ARTIFACT_DIR, METADATA_FILENAME, COMPACT_FILENAME, file_sha256
+COMPACT_FORMAT_VERSION = 1
+# Nilai diskrit setiap fitur; kolom tabel bobot mengikuti urutan ini
+FEATURE_VALUES = (-1, 0, 1)
+
+
+def one_hot(X):
+    """(n, n_fitur) bernilai -1/0/1 -> (n, n_fitur * 3) one-hot; nilai di luar rentang di-clip"""
+    X = np.asarray(X)
+    n_samples, n_features = X.shape
+    index = np.clip(np.rint(X).astype(np.int64) + 1, 0, len(FEATURE_VALUES) - 1)
+    encoded = np.zeros((n_samples, n_features * len(FEATURE_VALUES)), dtype=np.float32)
+    encoded[np.arange(n_samples)[:, None], np.arange(n_features) * len(FEATURE_VALUES) + index] = 1.0
+    return encoded
+
+
+class CompactScorer:
+    """
+    Model logistik ter-compile ke tabel lookup. Menyediakan predict_proba dan classes_
+    seperti model sklearn sehingga bisa dipakai langsung oleh score_rows.
+    """
+
+    def __init__(self, table, bias, classes, feature_names=(), metadata=None):
+        self.table = np.asarray(table, dtype=np.float64)
+        self.bias = float(bias)
+        self.classes_ = np.asarray(classes)
+        self.feature_names = list(feature_names)
+        self.metadata = metadata or {}
+        self._feature_index = np.arange(len(self.table))
+
+    def decision_function(self, X):
+        X = np.asarray(X)
+        index = np.clip(np.rint(X).astype(np.int64) + 1, 0, len(FEATURE_VALUES) - 1)
+        return self.bias + self.table[self._feature_index, index].sum(axis=1)
+
+    def predict_proba(self, X):
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, path):
+        data = {
+            'format_version': COMPACT_FORMAT_VERSION,
+            'feature_values': list(FEATURE_VALUES),
+            'feature_names': self.feature_names,
+            'classes': self.classes_.tolist(),
+            'bias': self.bias,
+            'table': self.table.tolist(),
+            'metadata': self.metadata,
+        }
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('format_version') != COMPACT_FORMAT_VERSION:
+            raise ValueError(f"Versi format model ringkas tidak didukung: {data.get('format_version')}")
+        return cls(data['table'], data['bias'], data['classes'], data['feature_names'], data.get('metadata'))
+
+
+class CascadeModel:
+    """
+    Model ringkas menjawab lebih dulu; baris dengan confidence di bawah `threshold`
+    diskor ulang oleh forest penuh. predict_proba/classes_ kompatibel dengan score_rows.
+    """
+
+    def __init__(self, compact, forest, threshold):
+        if list(compact.classes_) != list(forest.classes_):
+            raise ValueError('Kelas model ringkas dan forest tidak sama')
+        self.compact = compact
+        self.forest = forest
+        self.threshold = threshold
+        self.classes_ = forest.classes_
+        self.feature_names = getattr(forest, 'feature_names', [])
+        # Jumlah baris yang dijawab model ringkas vs diteruskan ke forest
+        self.compact_rows = 0
+        self.forest_rows = 0
+
+    def predict_proba(self, X):
+        proba = self.compact.predict_proba(X)
+        uncertain = np.flatnonzero(proba.max(axis=1) < self.threshold)
+        if uncertain.size:
+            proba[uncertain] = self.forest.predict_proba(np.asarray(X)[uncertain])
+        self.forest_rows += int(uncertain.size)
+        self.compact_rows += len(proba) - int(uncertain.size)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def distill(forest, X, feature_names=(), C=1.0):
+    """
+    Latih model logistik atas one-hot fitur untuk meniru probabilitas forest pada X
+    (soft target lewat sample weight: setiap baris muncul sebagai kelas positif dengan
+    bobot p dan kelas negatif dengan bobot 1 - p).
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    X = np.asarray(X, dtype=np.float32)
+    soft = forest.predict_proba(X)[:, 1]
+    encoded = one_hot(X)
+    classes = np.asarray(forest.classes_)
+    stacked = np.vstack([encoded, encoded])
+    labels = np.concatenate([np.full(len(X), classes[1]), np.full(len(X), classes[0])])
+    weights = np.concatenate([soft, 1.0 - soft])
+
+    logistic = LogisticRegression(C=C, max_iter=2000)
+    logistic.fit(stacked, labels, sample_weight=weights)
+    table = logistic.coef_[0].reshape(X.shape[1], len(FEATURE_VALUES))
+    return CompactScorer(table, logistic.intercept_[0], classes, feature_names)
+
+
+def evaluate_cascade(compact, forest, X, y, threshold):
+    """Fidelity model ringkas terhadap forest, cakupan (porsi baris yang dijawab model ringkas), dan akurasi"""
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    forest_pred = forest.predict(X)
+    compact_proba = compact.predict_proba(X)
+    cascade_pred = CascadeModel(compact, forest, threshold).predict(X)
+    return {
+        'threshold': threshold,
+        'compact_fidelity': float(np.mean(compact.classes_[np.argmax(compact_proba, axis=1)] == forest_pred)),
+        'cascade_fidelity': float(np.mean(cascade_pred == forest_pred)),
+        'compact_coverage': float(np.mean(compact_proba.max(axis=1) >= threshold)),
+        'forest_accuracy': float(np.mean(forest_pred == y)),
+        'cascade_accuracy': float(np.mean(cascade_pred == y)),
+    }
+
+
+def main(argv=None):
+    import argparse
+    from sklearn.model_selection import train_test_split
+    from forest_engine import CompiledForest
+    from feature_pipeline import FEATURE_COLUMNS, load_training_features
+    from phishing_detector import GUARDRAIL_THRESHOLD
+
+    parser = argparse.ArgumentParser(description='Distilasi forest phishing ke model ringkas (tabel lookup)')
+    parser.add_argument('--artifact', default=MODEL_ARTIFACT_DIR, help='Direktori artefak forest')
+    parser.add_argument('--data', default=os.path.join(os.path.dirname(__file__), '..', 'data', 'phishing_dataset.csv'))
+    parser.add_argument('--threshold', type=float, default=GUARDRAIL_THRESHOLD)
+    parser.add_argument('--random-state', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    forest = CompiledForest.load(args.artifact)
+    X, y, _ = load_training_features(args.data)
+    X_train, X_test, _, y_test = train_test_split(
+        X.to_numpy(), y.to_numpy(), test_size=0.2, random_state=args.random_state, stratify=y
+    )
+    compact = distill(forest, X_train, FEATURE_COLUMNS)
+    compact.metadata = evaluate_cascade(compact, forest, X_test, y_test, args.threshold)
+    compact.metadata['forest_metadata_sha256'] = file_sha256(os.path.join(args.artifact, METADATA_FILENAME))
+    compact.save(os.path.join(args.artifact, COMPACT_FILENAME))
+    print(json.dumps(compact.metadata, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""
+Pipeline fitur model phishing, dipakai bersama oleh serving dan training.
+
+- extract_model_features       : fitur satu URL (dict), dipakai app per request
+- extract_model_features_frame : fitur banyak URL sekaligus (DataFrame), dipakai batch scan
+- domain_labels / typo_domain_flags : fitur is_typo_domain secara massal (per domain unik)
+- load_training_features       : matriks fitur dataset training, di-cache ke .npy per hash
+                                 dataset sehingga retraining tidak menghitung ulang fitur
+"""
+import hashlib
+import os
+import re
+import numpy as np
+from urllib.parse import uses_params
+from typosquat import is_typo_domain, BRANDS_FILE
+from public_suffix import extract, PUBLIC_SUFFIX_FILE
+from url_parse import parse_url, url_port
+from forest_engine import file_sha256
+
+FEATURE_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'feature_cache')
+# Naikkan jika cara menghitung fitur berubah, agar matriks fitur lama di cache tidak dipakai
+FEATURE_PIPELINE_VERSION = 1
+
+# Urutan kolom fitur sesuai dataset training (data/phishing_dataset.csv) + is_typo_domain
+FEATURE_COLUMNS = [
+    'having_IP_Address', 'URL_Length', 'Shortining_Service', 'having_At_Symbol',
+    'double_slash_redirecting', 'Prefix_Suffix', 'having_Sub_Domain', 'SSLfinal_State',
+    'Domain_registeration_length', 'Favicon', 'port', 'HTTPS_token', 'Request_URL',
+    'URL_of_Anchor', 'Links_in_tags', 'SFH', 'Submitting_to_email', 'Abnormal_URL',
+    'Redirect', 'on_mouseover', 'RightClick', 'popUpWidnow', 'Iframe', 'age_of_domain',
+    'DNSRecord', 'web_traffic', 'Page_Rank', 'Google_Index', 'Links_pointing_to_page',
+    'Statistical_report', 'is_typo_domain'
+]
+
+# Fitur berbasis konten halaman yang tidak bisa dihitung dari URL saja (nilai default)
+DEFAULT_FEATURE_VALUES = {
+    'Favicon': 1,
+    'URL_of_Anchor': 0,
+    'Links_in_tags': 0,
+    'SFH': 0,
+    'Submitting_to_email': -1,
+    'Redirect': 0,
+    'on_mouseover': 1,
+    'RightClick': 1,
+    'popUpWidnow': 1,
+    'Iframe': 1,
+    'age_of_domain': 1,
+    'DNSRecord': 1,
+    'web_traffic': -1,
+    'Page_Rank': -1,
+    'Google_Index': -1,
+    'Links_pointing_to_page': 1,
+    'Statistical_report': 1,
+}
+
+SHORTENING_SERVICES = ['bit.ly', 'goo.gl', 'tinyurl']
+ABNORMAL_WORDS = ['login', 'secure', 'verify']
+
+# Pola urllib.parse.urlsplit: scheme opsional, netloc setelah "//", path sampai "?"/"#"
+URL_PARTS_RE = r'^(?:(?P<scheme>[A-Za-z][A-Za-z0-9+\-.]*):)?(?://(?P<netloc>[^/?#]*))?(?P<path>[^?#]*)'
+# Pola netloc longgar ala tldextract (scheme tidak wajib valid)
+LENIENT_NETLOC_RE = r'^(?:(?:[A-Za-z0-9+\-.]+:)?//)?(?P<netloc>[^/?#]*)'
+
+def domain_labels(urls):
+    """Label registered domain (tanpa suffix) untuk setiap URL; extract dijalankan sekali per netloc unik"""
+    import pandas as pd
+    urls = pd.Series(urls).fillna('').astype(str)
+    lenient_netloc = urls.str.extract(LENIENT_NETLOC_RE, expand=False).fillna('')
+    domain_by_netloc = {n: extract(n).domain for n in pd.unique(lenient_netloc)}
+    return lenient_netloc.map(domain_by_netloc)
+
+def typo_domain_flags(domains):
+    """is_typo_domain untuk banyak domain sekaligus (dicek sekali per domain unik); return array int"""
+    import pandas as pd
+    domains = pd.Series(domains)
+    typo_by_domain = {d: is_typo_domain(d) for d in pd.unique(domains)}
+    return domains.map(typo_by_domain).astype(int).to_numpy()
+
+def extract_model_features(url, parsed=None):
+    """Extract features compatible with the trained model"""
+    if parsed is None:
+        parsed = parse_url(url)
+    parts = parsed.parts
+    extracted = parsed.extracted
+    hostname = parts.hostname or ""
+    hostname_l = hostname.lower()
+    # Root domain (tanpa subdomain) untuk fitur yang seharusnya tidak bias oleh subdomain normal seperti dashboard.*
+    registered_domain = ".".join([p for p in [extracted.domain, extracted.suffix] if p]).lower()
+
+    features = {
+        'having_IP_Address': -1 if hostname and hostname.replace('.', '').isdigit() else 1,
+        'URL_Length': 1 if len(url) > 75 else 0,
+        'Shortining_Service': 1 if any(service in url for service in SHORTENING_SERVICES) else -1,
+        'having_At_Symbol': 1 if '@' in url else -1,
+        'double_slash_redirecting': 1 if '//' in url[8:] else -1,
+        'Prefix_Suffix': 1 if '-' in hostname else -1,
+        # Dataset-style: banyak subdomain biasanya mencurigakan. Satu subdomain seperti dashboard.* umum pada SaaS.
+        # 0 = normal/sedang, 1 = banyak subdomain
+        'having_Sub_Domain': 1 if (hostname_l and not hostname_l.startswith('www.') and hostname_l.count('.') >= 3) else 0,
+        'SSLfinal_State': 1 if parts.scheme == 'https' else -1,
+        # Pakai panjang root-domain, bukan hostname penuh (biar subdomain normal tidak dianggap mencurigakan)
+        'Domain_registeration_length': 1 if len(extracted.domain) > 10 else -1,
+        'Favicon': 1,  # Default value
+        'port': 1 if url_port(parts) else -1,
+        'HTTPS_token': 1 if hostname and ('https' in hostname_l) else -1,
+        # Root path "/" itu normal; jangan dianggap request/path mencurigakan.
+        'Request_URL': 1 if (parts.path and parts.path != "/") else -1,
+        'URL_of_Anchor': 0,  # Default value
+        'Links_in_tags': 0,  # Default value
+        'SFH': 0,  # Default value
+        'Submitting_to_email': -1,  # Default value
+        'Abnormal_URL': 1 if any(suspicious in url for suspicious in ABNORMAL_WORDS) else -1,
+        'Redirect': 0,  # Default value
+        'on_mouseover': 1,  # Default value
+        'RightClick': 1,  # Default value
+        'popUpWidnow': 1,  # Default value
+        'Iframe': 1,  # Default value
+        'age_of_domain': 1,  # Default value
+        'DNSRecord': 1,  # Default value
+        'web_traffic': -1,  # Default value
+        'Page_Rank': -1,  # Default value
+        'Google_Index': -1,  # Default value
+        'Links_pointing_to_page': 1,  # Default value
+        'Statistical_report': 1,  # Default value
+        'is_typo_domain': is_typo_domain(extracted.domain)  # Tambahkan fitur yang hilang
+    }
+
+    return features
+
+def extract_model_features_frame(urls, parsed=None):
+    """
+    Versi kolumnar dari extract_model_features untuk banyak URL sekaligus.
+
+    Menerima pandas Series / list / Arrow array berisi URL dan mengembalikan DataFrame
+    dengan kolom FEATURE_COLUMNS (index mengikuti input). Semua fitur dihitung dengan
+    operasi string vektor; extract suffix dan cek typo hanya dijalankan per host unik.
+    URL dengan port tidak valid diperlakukan sebagai tanpa port (sama dengan versi per-URL).
+    `parsed` (list hasil parse_url, urutan sama dengan urls) opsional: jika ada, label domain
+    diambil dari sana tanpa extract suffix ulang.
+    """
+    # pandas di-import di sini agar jalur prediksi per-URL tidak memuatnya
+    import pandas as pd
+
+    if hasattr(urls, 'to_pandas'):
+        urls = urls.to_pandas()
+    urls = pd.Series(urls).fillna('').astype(str)
+
+    parts = urls.str.extract(URL_PARTS_RE)
+    scheme = parts['scheme'].fillna('').str.lower()
+    netloc = parts['netloc'].fillna('')
+    path = parts['path'].fillna('')
+    # urlparse memisahkan ";params" dari segmen path terakhir untuk scheme tertentu
+    path = path.where(~scheme.isin(uses_params), path.str.replace(r';[^/]*$', '', regex=True))
+
+    # hostname & port seperti urlparse: buang userinfo, IPv6 di dalam [], lalu lowercase
+    host_port = netloc.str.rpartition('@')[2]
+    bracketed = host_port.str.startswith('[')
+    hostname = host_port.str.partition(':')[0]
+    hostname = hostname.where(~bracketed, host_port.str.extract(r'^\[([^\]]*)\]', expand=False).fillna(''))
+    hostname = hostname.str.lower()
+    port_str = host_port.str.partition(':')[2].where(~bracketed, host_port.str.extract(r'\]:(.*)$', expand=False).fillna(''))
+    port_num = pd.to_numeric(port_str.where(port_str.str.fullmatch(r'\d+'), None), errors='coerce')
+    has_port = (port_num > 0) & (port_num <= 65535)
+
+    if parsed is not None:
+        domain = pd.Series([p.extracted.domain for p in parsed], index=urls.index, dtype=object)
+    else:
+        domain = domain_labels(urls)
+
+    def flag(mask, yes=1, no=-1):
+        return np.where(mask, yes, no)
+
+    has_host = hostname != ''
+    columns = {
+        'having_IP_Address': flag(has_host & hostname.str.replace('.', '', regex=False).str.isdigit(), -1, 1),
+        'URL_Length': flag(urls.str.len() > 75, 1, 0),
+        'Shortining_Service': flag(urls.str.contains('|'.join(map(re.escape, SHORTENING_SERVICES)), regex=True)),
+        'having_At_Symbol': flag(urls.str.contains('@', regex=False)),
+        'double_slash_redirecting': flag(urls.str[8:].str.contains('//', regex=False)),
+        'Prefix_Suffix': flag(hostname.str.contains('-', regex=False)),
+        'having_Sub_Domain': flag(has_host & ~hostname.str.startswith('www.') & (hostname.str.count(r'\.') >= 3), 1, 0),
+        'SSLfinal_State': flag(scheme == 'https'),
+        'Domain_registeration_length': flag(domain.str.len() > 10),
+        'port': flag(has_port),
+        'HTTPS_token': flag(hostname.str.contains('https', regex=False)),
+        'Request_URL': flag((path != '') & (path != '/')),
+        'Abnormal_URL': flag(urls.str.contains('|'.join(ABNORMAL_WORDS), regex=True)),
+        'is_typo_domain': typo_domain_flags(domain),
+    }
+    for name, value in DEFAULT_FEATURE_VALUES.items():
+        columns[name] = np.full(len(urls), value)
+
+    return pd.DataFrame(columns, index=urls.index)[FEATURE_COLUMNS]
+
+def dataset_features(df):
+    """
+    Matriks fitur (kolom FEATURE_COLUMNS) dan label dari DataFrame dataset training.
+    is_typo_domain dihitung dari kolom url dengan fungsi yang sama seperti serving;
+    dataset tanpa kolom url tidak punya informasi domain, sehingga fitur ini bernilai 0.
+    """
+    df = df.copy()
+    if 'is_typo_domain' not in df.columns:
+        if 'url' in df.columns:
+            df['is_typo_domain'] = typo_domain_flags(domain_labels(df['url']))
+        else:
+            print('Peringatan: dataset tanpa kolom url, fitur is_typo_domain diisi 0')
+            df['is_typo_domain'] = 0
+    return df[FEATURE_COLUMNS], df['Result']
+
+def feature_cache_key(path):
+    """
+    Kunci cache matriks fitur: hash dataset + versi pipeline + daftar brand & suffix
+    (keduanya memengaruhi is_typo_domain)
+    """
+    digest = hashlib.sha256(f'v{FEATURE_PIPELINE_VERSION}'.encode())
+    for source in [path, BRANDS_FILE, PUBLIC_SUFFIX_FILE]:
+        digest.update(file_sha256(source).encode() if os.path.exists(source) else b'-')
+    return digest.hexdigest()[:32]
+
+def _save_npy(path, array):
+    # Tulis ke file sementara lalu rename, agar proses lain tidak membaca file setengah jadi
+    with open(path + '.tmp', 'wb') as f:
+        np.save(f, array, allow_pickle=False)
+    os.replace(path + '.tmp', path)
+
+def load_training_features(path, cache_dir=FEATURE_CACHE_DIR, use_cache=True):
+    """
+    Baca dataset training dan hitung fitur; hasilnya di-cache sebagai <key>.X.npy & <key>.y.npy.
+    Return (X DataFrame kolom FEATURE_COLUMNS, y Series, cache_hit).
+    """
+    import pandas as pd
+    key = feature_cache_key(path)
+    X_path = os.path.join(cache_dir, f'{key}.X.npy')
+    y_path = os.path.join(cache_dir, f'{key}.y.npy')
+    if use_cache and os.path.exists(X_path) and os.path.exists(y_path):
+        X = pd.DataFrame(np.load(X_path, allow_pickle=False), columns=FEATURE_COLUMNS)
+        y = pd.Series(np.load(y_path, allow_pickle=False), name='Result')
+        return X, y, True
+
+    X, y = dataset_features(pd.read_csv(path))
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        _save_npy(X_path, X.to_numpy())
+        _save_npy(y_path, y.to_numpy())
+    return X, y, False
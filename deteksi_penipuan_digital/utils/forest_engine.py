@@ -0,0 +1,229 @@
+"""
+Inference engine RandomForest berbasis NumPy murni.
+
+Forest sklearn diekspor menjadi artefak model berversi: satu direktori berisi
+metadata.json (urutan fitur, kelas, hash data training, versi sklearn, checksum array)
+dan file .npy per array (feature, threshold, children, nilai leaf). Array dibuka dengan
+memory-map, sehingga load hampir instan dan beberapa worker Streamlit berbagi page
+memori yang sama dari page cache OS. App bisa scoring tanpa mengimpor sklearn.
+
+Contoh ekspor dari model pickle:
+    python utils/forest_engine.py phishing_model.pkl phishing_model
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+import numpy as np
+
+MODEL_ARTIFACT_DIR = os.path.join(os.path.dirname(__file__), '..', 'phishing_model')
+METADATA_FILENAME = 'metadata.json'
+# Model ringkas hasil distilasi (utils/compact_scorer.py), hanya berlaku untuk forest asalnya
+COMPACT_FILENAME = 'compact_scorer.json'
+# Naikkan jika layout artefak berubah; loader menolak versi yang tidak dikenal
+ARTIFACT_FORMAT_VERSION = 1
+ARRAY_NAMES = ['feature', 'threshold', 'left', 'right', 'value', 'roots', 'classes', 'is_leaf']
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def flatten_forest(model):
+    """
+    Ratakan semua tree dari RandomForestClassifier ke satu set array.
+    Return (arrays, max_depth) dengan key arrays sesuai ARRAY_NAMES.
+
+    Node leaf menunjuk ke dirinya sendiri (left = right = index leaf), sehingga leaf
+    bisa dikenali tanpa array tambahan dan semua tree ditelusuri bersamaan.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+
+        left = np.where(is_leaf, node_ids, tree.children_left) + offset
+        right = np.where(is_leaf, node_ids, tree.children_right) + offset
+        # Probabilitas per leaf sama seperti DecisionTreeClassifier.predict_proba
+        value = tree.value[:, 0, :].astype(np.float64)
+        totals = value.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1.0
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        lefts.append(left)
+        rights.append(right)
+        values.append(value / totals)
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    left = np.concatenate(lefts).astype(np.int32)
+    arrays = {
+        'feature': np.concatenate(features).astype(np.int32),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        'left': left,
+        'right': np.concatenate(rights).astype(np.int32),
+        'value': np.concatenate(values),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'classes': np.asarray(model.classes_),
+        'is_leaf': left == np.arange(len(left)),
+    }
+    return arrays, max_depth
+
+
+def compile_forest(model, feature_names=None):
+    """CompiledForest di memori (tanpa menulis artefak), misalnya untuk mengukur latensi kandidat"""
+    arrays, max_depth = flatten_forest(model)
+    if feature_names is None:
+        feature_names = getattr(model, 'feature_names_in_', [])
+    return CompiledForest(max_depth=max_depth, feature_names=[str(n) for n in feature_names], **arrays)
+
+
+def export_forest(model, path=MODEL_ARTIFACT_DIR, feature_names=None, training_data=None, training_info=None):
+    """
+    Simpan forest sebagai direktori artefak (metadata.json + .npy). `training_data` (path CSV)
+    opsional, hanya dicatat hash-nya di metadata; `training_info` (dict, misalnya
+    hyperparameter dan hasil evaluasi) disimpan apa adanya di metadata['training'].
+    """
+    arrays, max_depth = flatten_forest(model)
+    if feature_names is None:
+        feature_names = getattr(model, 'feature_names_in_', [])
+
+    os.makedirs(path, exist_ok=True)
+    # Model ringkas lama didistilasi dari forest sebelumnya; distilasi ulang setelah export
+    compact_path = os.path.join(path, COMPACT_FILENAME)
+    if os.path.exists(compact_path):
+        os.remove(compact_path)
+    array_info = {}
+    for name in ARRAY_NAMES:
+        filename = f'{name}.npy'
+        np.save(os.path.join(path, filename), arrays[name], allow_pickle=False)
+        array_info[name] = {
+            'file': filename,
+            'dtype': arrays[name].dtype.str,
+            'shape': list(arrays[name].shape),
+            'sha256': file_sha256(os.path.join(path, filename)),
+        }
+
+    try:
+        import sklearn
+        sklearn_version = sklearn.__version__
+    except ImportError:
+        sklearn_version = None
+    metadata = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_type': type(model).__name__,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'sklearn_version': sklearn_version,
+        'numpy_version': np.__version__,
+        'training_data_sha256': file_sha256(training_data) if training_data else None,
+        'feature_names': [str(name) for name in feature_names],
+        'classes': arrays['classes'].tolist(),
+        'n_estimators': len(arrays['roots']),
+        'n_nodes': len(arrays['left']),
+        'max_depth': int(max_depth),
+        'arrays': array_info,
+        'training': training_info or {},
+    }
+    # metadata.json ditulis terakhir (via rename) agar loader tidak melihat artefak setengah jadi
+    metadata_path = os.path.join(path, METADATA_FILENAME)
+    with open(metadata_path + '.tmp', 'w') as f:
+        json.dump(metadata, f, indent=2, sort_keys=True)
+    os.replace(metadata_path + '.tmp', metadata_path)
+    return metadata
+
+
+class CompiledForest:
+    """
+    Forest hasil export_forest. Menyediakan predict_proba dan classes_ seperti
+    RandomForestClassifier, dengan probabilitas yang identik.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, max_depth,
+                 feature_names=(), is_leaf=None, metadata=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.feature_names = list(feature_names)
+        self.n_estimators = len(roots)
+        self.is_leaf = left == np.arange(len(left)) if is_leaf is None else is_leaf
+        self.metadata = metadata or {}
+
+    @classmethod
+    def load(cls, path=MODEL_ARTIFACT_DIR, mmap=True):
+        """Buka artefak model; array di-memory-map (read-only) kecuali mmap=False"""
+        with open(os.path.join(path, METADATA_FILENAME)) as f:
+            metadata = json.load(f)
+        version = metadata.get('format_version')
+        if version != ARTIFACT_FORMAT_VERSION:
+            raise ValueError(f'Versi format artefak model tidak didukung: {version}')
+        arrays = {}
+        for name in ARRAY_NAMES:
+            info = metadata['arrays'][name]
+            array = np.load(os.path.join(path, info['file']), mmap_mode='r' if mmap else None, allow_pickle=False)
+            if array.dtype.str != info['dtype'] or list(array.shape) != info['shape']:
+                raise ValueError(f'Array {name} tidak sesuai metadata artefak model: {path}')
+            arrays[name] = array
+        return cls(max_depth=metadata['max_depth'], feature_names=metadata['feature_names'],
+                   metadata=metadata, **arrays)
+
+    def apply(self, X):
+        """Return index leaf (n_samples, n_estimators) untuk setiap baris X"""
+        # sklearn membandingkan fitur dalam float32 dengan threshold float64
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        # Satu posisi per pasangan (baris, tree); hanya yang belum sampai leaf yang diproses
+        row_base = np.repeat(np.arange(n_samples) * n_features, self.n_estimators)
+        nodes = np.tile(self.roots, n_samples)
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        while active.size:
+            current = nodes[active]
+            go_left = flat_X[row_base[active] + self.feature[current]] <= self.threshold[current]
+            next_nodes = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = next_nodes
+            active = active[~self.is_leaf[next_nodes]]
+        return nodes.reshape(n_samples, self.n_estimators)
+
+    def predict_proba(self, X):
+        leaf_values = self.value[self.apply(X)]
+        # Rata-rata probabilitas semua tree, dijumlah berurutan seperti sklearn
+        proba = leaf_values[:, 0, :].copy()
+        for j in range(1, self.n_estimators):
+            proba += leaf_values[:, j, :]
+        return proba / self.n_estimators
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print('Usage: python utils/forest_engine.py MODEL.pkl [OUTPUT_DIR] [TRAINING_DATA.csv]')
+        return 1
+    import pickle
+    with open(argv[0], 'rb') as f:
+        model = pickle.load(f)
+    output = argv[1] if len(argv) > 1 else MODEL_ARTIFACT_DIR
+    export_forest(model, output, training_data=argv[2] if len(argv) > 2 else None)
+    print(f'Artefak model disimpan ke {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Micro-batching inference: request satu baris dari banyak thread (sesi Streamlit, worker API)
+dikumpulkan lalu diskor dengan satu predict_proba.
+
+    model = BatchingModel(load_model())
+    model.predict_proba(row)   # row (1, n_fitur); diblok sampai batch-nya selesai diskor
+
+- Satu thread scheduler per model: ambil semua baris yang antre (maks max_batch); jika
+  max_wait > 0, tunggu dulu baris berikutnya maksimal max_wait detik; lalu satu predict_proba
+- Setiap pemanggil menerima hasilnya lewat Future miliknya; error saat menyusun batch atau
+  menjalankan model diteruskan ke semua pemanggil di batch tersebut. Pemanggil menunggu paling
+  lama RESULT_TIMEOUT detik, jadi thread scheduler yang mati tidak memblokir request selamanya
+- Input lebih dari satu baris (batch scan, API batch) sudah ter-batch, jadi langsung
+  diskor tanpa antre
+"""
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+MAX_BATCH_SIZE = 64
+# Jendela pengumpulan (detik) setelah baris pertama masuk. Default 0: batch berisi semua baris
+# yang antre selagi batch sebelumnya diskor, sehingga request tunggal tidak ikut menunggu.
+# Jendela > 0 hanya berguna jika predict_proba sangat murah dibanding jeda antar request.
+MAX_WAIT = 0.0
+# Batas tunggu hasil per pemanggil (detik)
+RESULT_TIMEOUT = 30.0
+
+
+class InferenceScheduler:
+    """Antrean baris + thread background yang menjalankan predict_proba per batch"""
+
+    def __init__(self, model, max_batch=MAX_BATCH_SIZE, max_wait=MAX_WAIT):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending = []
+        self._condition = threading.Condition()
+        self._closed = False
+        # Statistik: jumlah batch dan baris yang sudah diskor
+        self.batches = 0
+        self.rows = 0
+        self._thread = threading.Thread(target=self._run, name='inference-scheduler', daemon=True)
+        self._thread.start()
+
+    def submit(self, row):
+        """Antrekan satu baris fitur (disalin); return Future berisi baris probabilitas"""
+        future = Future()
+        item = (np.array(row, dtype=np.float32).reshape(-1), future)
+        with self._condition:
+            if self._closed or not self._thread.is_alive():
+                raise RuntimeError('InferenceScheduler sudah ditutup')
+            self._pending.append(item)
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._condition.notify()
+        return future
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _take_batch(self):
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if self.max_wait and len(self._pending) < self.max_batch:
+                deadline = time.monotonic() + self.max_wait
+                while len(self._pending) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return  # ditutup dan antrean kosong
+            # Future yang sudah dibatalkan pemanggilnya tidak ikut diskor
+            live = [(row, future) for row, future in batch if future.set_running_or_notify_cancel()]
+            if not live:
+                continue
+            try:
+                # np.stack di dalam try: baris dengan bentuk berbeda menggagalkan batch ini saja
+                probabilities = self.model.predict_proba(np.stack([row for row, _ in live]))
+                if len(probabilities) != len(live):
+                    raise ValueError(f'predict_proba mengembalikan {len(probabilities)} baris untuk {len(live)} input')
+            except BaseException as e:
+                for _, future in live:
+                    future.set_exception(e)
+                if not isinstance(e, Exception):
+                    raise
+                continue
+            self.batches += 1
+            self.rows += len(live)
+            for (_, future), probability in zip(live, probabilities):
+                future.set_result(probability)
+
+
+class BatchingModel:
+    """
+    Pembungkus model dengan antarmuka predict_proba/classes_ (kompatibel dengan score_rows):
+    panggilan satu baris lewat InferenceScheduler, banyak baris langsung ke model.
+    """
+
+    def __init__(self, model, max_batch=MAX_BATCH_SIZE, max_wait=MAX_WAIT, timeout=RESULT_TIMEOUT):
+        self.model = model
+        self.timeout = timeout
+        self.classes_ = model.classes_
+        self.feature_names = getattr(model, 'feature_names', [])
+        self.scheduler = InferenceScheduler(model, max_batch, max_wait)
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        if X.shape[0] != 1:
+            return self.model.predict_proba(X)
+        return self.scheduler.submit(X[0]).result(timeout=self.timeout)[None, :]
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
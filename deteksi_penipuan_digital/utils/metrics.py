@@ -0,0 +1,333 @@
+"""
+Metrik operasional level proses: counter dan histogram latensi.
+
+- Update tanpa lock: setiap thread menulis ke shard miliknya sendiri (dict per thread);
+  lock hanya dipakai saat thread pertama kali menulis, saat thread berakhir (shard-nya
+  dilebur ke total), dan saat membaca/merender
+- Total disimpan berkala ke satu file per proses (data/metrics/<role>-<pid>.json), sehingga
+  proses Streamlit/worker API tidak saling menimpa. Saat start, proses mengambil alih file
+  milik proses ber-role sama yang sudah berhenti (rename atomik, lalu dilebur ke totalnya),
+  sehingga angka tidak kembali ke nol setiap restart dan tidak terhitung dua kali
+- Format teks Prometheus tersedia lewat render_prometheus(); server readiness
+  (utils/warmup.py) melayaninya di GET /metrics. Setiap seri diberi label pid karena nilainya
+  milik satu proses; jumlahkan antar proses di Prometheus (sum without (pid))
+"""
+import atexit
+import json
+import os
+import threading
+import weakref
+from bisect import bisect_left
+
+METRICS_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'metrics')
+PERSIST_INTERVAL = 60
+
+# Batas bucket histogram latensi (detik); bucket terakhir +Inf ditambahkan otomatis
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _ShardHolder:
+    """Pemilik shard di threading.local; saat thread berakhir objek ini dibuang dan shard dilebur"""
+    __slots__ = ('shard', '__weakref__')
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._local = threading.local()
+        # RLock: finalizer shard bisa terpicu garbage collector saat lock sedang dipegang thread ini
+        self._lock = threading.RLock()
+        self._shards = []
+        # Total dari thread yang sudah berakhir + nilai yang dimuat dari file
+        self._retired = {}
+
+    def _shard(self):
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            holder = _ShardHolder()
+            holder.shard = {}
+            with self._lock:
+                self._shards.append(holder.shard)
+            weakref.finalize(holder, self._retire, holder.shard)
+            self._local.holder = holder
+        return holder.shard
+
+    def _retire(self, shard):
+        with self._lock:
+            self._shards.remove(shard)
+            for key, value in shard.items():
+                self._retired[key] = self._merge(self._retired.get(key), value)
+
+    def _merge(self, total, value):
+        raise NotImplementedError
+
+    def values(self):
+        """{label key (tuple pasangan label terurut): nilai gabungan semua thread}"""
+        with self._lock:
+            merged = {key: self._merge(None, value) for key, value in self._retired.items()}
+            for shard in list(self._shards):
+                # Thread pemilik bisa sedang menambah key baru; salin ulang jika dict berubah
+                while True:
+                    try:
+                        items = list(shard.items())
+                        break
+                    except RuntimeError:
+                        continue
+                for key, value in items:
+                    merged[key] = self._merge(merged.get(key), value)
+        return merged
+
+
+def _key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        shard = self._shard()
+        key = _key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def _merge(self, total, value):
+        return value if total is None else total + value
+
+    def total(self, **labels):
+        """Jumlah semua seri yang cocok dengan label yang diberikan (tanpa label = semua seri)"""
+        wanted = set(labels.items())
+        return sum(v for key, v in self.values().items() if wanted <= set(key))
+
+    def _dump(self, value):
+        return value
+
+    def _load(self, value):
+        return value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        shard = self._shard()
+        key = _key(labels)
+        state = shard.get(key)
+        if state is None:
+            # [jumlah per bucket (non-kumulatif, + bucket +Inf), sum, count]
+            state = shard[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def _merge(self, total, value):
+        if total is None:
+            return [list(value[0]), value[1], value[2]]
+        return [[a + b for a, b in zip(total[0], value[0])], total[1] + value[1], total[2] + value[2]]
+
+    def _dump(self, value):
+        return {'buckets': value[0], 'sum': value[1], 'count': value[2]}
+
+    def _load(self, value):
+        if len(value['buckets']) != len(self.buckets) + 1:
+            raise ValueError(f'Jumlah bucket {self.name} berubah')
+        return [list(value['buckets']), value['sum'], value['count']]
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # proses ada, tetapi milik user lain
+    return True
+
+
+class MetricsRegistry:
+    def __init__(self, directory=METRICS_DIR, role='app'):
+        self.directory = directory
+        self.role = role
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._persist_thread = None
+        self._stop = threading.Event()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f'Metrik {metric.name} sudah terdaftar dengan tipe lain')
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text):
+        return self._register(Counter(name, help_text))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help_text, buckets))
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    @property
+    def path(self):
+        """File milik proses ini (pid dibaca saat dipanggil, aman setelah fork)"""
+        return os.path.join(self.directory, f'{self.role}-{os.getpid()}.json')
+
+    def snapshot(self):
+        """Nilai semua metrik dalam bentuk JSON-able: {nama: [[label dict, nilai], ...]}"""
+        return {
+            name: [[dict(key), metric._dump(value)] for key, value in sorted(metric.values().items())]
+            for name, metric in sorted(self._metrics.items())
+        }
+
+    def save(self):
+        path = self.path
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.snapshot(), f, indent=2, sort_keys=True)
+        os.replace(path + '.tmp', path)
+
+    def load(self):
+        """
+        Ambil alih file metrik milik proses dengan role sama yang sudah berhenti dan lebur ke
+        total proses ini. File proses yang masih hidup dilewati. Return jumlah file yang dilebur.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return 0
+        merged = 0
+        for name in sorted(names):
+            stem, ext = os.path.splitext(name)
+            role, _, pid = stem.rpartition('-')
+            if ext != '.json' or role != self.role or not pid.isdigit():
+                continue
+            if int(pid) == os.getpid() or _pid_alive(int(pid)):
+                continue
+            # Rename atomik: jika dua proses start bersamaan, hanya satu yang berhasil mengklaim
+            claimed = os.path.join(self.directory, f'{name}.claimed-{os.getpid()}')
+            try:
+                os.rename(os.path.join(self.directory, name), claimed)
+            except OSError:
+                continue
+            try:
+                with open(claimed) as f:
+                    self._merge_snapshot(json.load(f))
+                merged += 1
+            except (OSError, ValueError):
+                pass
+            finally:
+                os.remove(claimed)
+        return merged
+
+    def _merge_snapshot(self, data):
+        for name, series in data.items():
+            metric = self._metrics.get(name)
+            if metric is None:
+                continue
+            try:
+                loaded = {_key(labels): metric._load(value) for labels, value in series}
+            except (KeyError, TypeError, ValueError):
+                continue
+            with metric._lock:
+                for key, value in loaded.items():
+                    metric._retired[key] = metric._merge(metric._retired.get(key), value)
+
+    def start_persistence(self, interval=PERSIST_INTERVAL, role=None):
+        """
+        Ambil alih total proses yang sudah berhenti lalu simpan berkala di thread background
+        (sekali per proses). `role` (misalnya 'streamlit', 'api') menjadi prefix nama file.
+        """
+        with self._lock:
+            if self._persist_thread is not None:
+                return self._persist_thread
+            if role is not None:
+                self.role = role
+            self._persist_thread = threading.Thread(
+                target=self._persist_loop, args=(interval,), name='metrics-persist', daemon=True
+            )
+        if self.load():
+            # Total yang diambil alih langsung ditulis ke file proses ini (file lama sudah dihapus)
+            try:
+                self.save()
+            except OSError:
+                pass
+        self._persist_thread.start()
+        atexit.register(self.save)
+        return self._persist_thread
+
+    def _persist_loop(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.save()
+            except OSError:
+                pass
+
+    def render_prometheus(self):
+        """
+        Semua metrik dalam format teks Prometheus (text/plain; version=0.0.4). Setiap seri
+        berlabel pid proses ini, sehingga seri dari worker berbeda tidak tercampur.
+        """
+        process = (('pid', str(os.getpid())),)
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for key, value in sorted(metric.values().items()):
+                key = key + process
+                if metric.kind == 'counter':
+                    lines.append(f'{name}{_labels(key)} {_number(value)}')
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket in zip(metric.buckets + (float('inf'),), counts):
+                    cumulative += bucket
+                    le = '+Inf' if bound == float('inf') else _number(bound)
+                    lines.append(f'{name}_bucket{_labels(key + (("le", le),))} {cumulative}')
+                lines.append(f'{name}_sum{_labels(key)} {_number(total)}')
+                lines.append(f'{name}_count{_labels(key)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(key):
+    if not key:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in key) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = MetricsRegistry()
+
+# Metrik aplikasi (label di komentar)
+URL_ANALYSES = REGISTRY.counter('url_analyses_total', 'Analisis URL phishing (source=fresh|cache|api)')
+URL_ANALYSIS_SECONDS = REGISTRY.histogram(
+    'url_analysis_seconds', 'Latensi analisis URL phishing end-to-end (source=fresh|cache)'
+)
+URL_VERDICTS = REGISTRY.counter('url_verdicts_total', 'Distribusi hasil analisis URL (verdict, risk)')
+VERDICT_CACHE_LOOKUPS = REGISTRY.counter('verdict_cache_lookups_total', 'Lookup verdict cache (result=hit|miss)')
+NETWORK_PROBES = REGISTRY.counter(
+    'network_probes_total', 'Probe jaringan per URL (probe=domain_age|redirect_count|favicon_domain_match, '
+    'outcome=ok|error|timeout)'
+)
+EMAIL_ANALYSES = REGISTRY.counter('email_analyses_total', 'Analisis email (result=spam|aman)')
+PHONE_CHECKS = REGISTRY.counter('phone_checks_total', 'Pemeriksaan nomor HP (result=mencurigakan|aman)')
+USER_REPORTS = REGISTRY.counter('user_reports_total', 'Laporan pengguna (kind=url|phone)')
+API_REQUESTS = REGISTRY.counter('api_requests_total', 'Request REST API (endpoint, status)')
+API_REQUEST_SECONDS = REGISTRY.histogram('api_request_seconds', 'Latensi request REST API (endpoint)')
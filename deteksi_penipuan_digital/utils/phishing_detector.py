@@ -0,0 +1,269 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import numpy as np
+from forest_engine import CompiledForest, MODEL_ARTIFACT_DIR, METADATA_FILENAME, file_sha256
+from compact_scorer import CompactScorer, CascadeModel, COMPACT_FILENAME
+from inference_scheduler import BatchingModel
+from allowlist import get_allowlist
+from url_parse import parse_url
+from feature_pipeline import FEATURE_COLUMNS, extract_model_features, extract_model_features_frame
+import tracing
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = os.path.join(os.path.dirname(__file__), '..', 'phishing_model.pkl')
+
+# Di bawah confidence ini prediksi phishing dianggap ragu: guardrail aktif, dan pada model
+# cascade baris tersebut diskor ulang oleh forest penuh
+GUARDRAIL_THRESHOLD = 0.80
+
+# Cascade (model ringkas + forest) lebih cepat tetapi sedikit kurang akurat dari forest penuh
+# (lihat metadata compact_scorer.json), jadi hanya dipakai jika diaktifkan: DETEKSI_CASCADE=1
+CASCADE_ENV = 'DETEKSI_CASCADE'
+# Micro-batching (utils/inference_scheduler.py) hanya menguntungkan jika banyak thread memanggil
+# model forest bersamaan (worker API); untuk satu sesi atau model cascade justru menambah latensi.
+# Aktif jika DETEKSI_BATCHING=1 (api.py menyalakannya)
+BATCHING_ENV = 'DETEKSI_BATCHING'
+
+# Buffer baris fitur per thread (dipakai ulang setiap request, tanpa membangun DataFrame)
+_row_buffer = threading.local()
+
+# Cache hash file model per (path, mtime, ukuran)
+_fingerprints = {}
+
+# Model level modul (lihat get_model), dipakai bersama oleh warm-up dan semua sesi
+_model = None
+_model_lock = threading.Lock()
+
+def default_model_path():
+    """Artefak model (direktori phishing_model/) jika ada, jika tidak pickle sklearn"""
+    if os.path.exists(os.path.join(MODEL_ARTIFACT_DIR, METADATA_FILENAME)):
+        return MODEL_ARTIFACT_DIR
+    return MODEL_FILE
+
+def load_model(path=None, cascade=None):
+    """
+    Load the trained phishing detection model (tanpa Streamlit).
+
+    Default: pakai artefak model (direktori phishing_model/, memory-mapped, tanpa import
+    sklearn) jika ada, jika tidak fallback ke pickle sklearn. Path direktori artefak atau
+    file .pkl bisa diberikan eksplisit. Jika artefak berisi model ringkas hasil distilasi
+    (compact_scorer.json) dan cascade aktif, return CascadeModel (model ringkas + forest).
+    cascade=None mengikuti env DETEKSI_CASCADE (default mati: forest penuh).
+    Model ringkas yang bukan hasil distilasi forest ini (hash metadata.json berbeda) diabaikan.
+    """
+    if path is None:
+        path = default_model_path()
+    if cascade is None:
+        cascade = os.environ.get(CASCADE_ENV) == '1'
+    if os.path.isdir(path):
+        model = CompiledForest.load(path)
+        if model.feature_names and model.feature_names != FEATURE_COLUMNS:
+            raise ValueError(f"Urutan fitur model tidak sesuai FEATURE_COLUMNS: {model.feature_names}")
+        compact_path = os.path.join(path, COMPACT_FILENAME)
+        if cascade and os.path.exists(compact_path):
+            compact = CompactScorer.load(compact_path)
+            if compact.feature_names and compact.feature_names != FEATURE_COLUMNS:
+                raise ValueError(f"Urutan fitur model ringkas tidak sesuai FEATURE_COLUMNS: {compact.feature_names}")
+            if compact.metadata.get('forest_metadata_sha256') != file_sha256(os.path.join(path, METADATA_FILENAME)):
+                logger.warning('Model ringkas %s bukan hasil distilasi forest ini; cascade tidak dipakai', compact_path)
+                return model
+            # Threshold cascade ikut disimpan saat distilasi (default GUARDRAIL_THRESHOLD)
+            model = CascadeModel(compact, model, compact.metadata.get('threshold', GUARDRAIL_THRESHOLD))
+        return model
+    with open(path, 'rb') as f:
+        model = pickle.load(f)
+    return prepare_model(model)
+
+def get_model():
+    """
+    Model default, di-load sekali per proses (oleh warm-up atau request pertama).
+    Jika DETEKSI_BATCHING=1 dan modelnya bukan cascade, dibungkus BatchingModel: scoring satu
+    baris dari banyak thread yang bersamaan digabung menjadi satu predict_proba.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                model = load_model()
+                if os.environ.get(BATCHING_ENV) == '1' and not isinstance(model, CascadeModel):
+                    model = BatchingModel(model)
+                _model = model
+    return _model
+
+def model_fingerprint(path=None):
+    """
+    Hash isi file model (dipakai untuk menginvalidasi cache verdict saat model diganti).
+    Untuk artefak model yang di-hash adalah metadata.json (berisi checksum setiap array)
+    dan model ringkas jika ada. Hash hanya dihitung ulang jika mtime/ukuran file berubah.
+    """
+    if path is None:
+        path = default_model_path()
+    if os.path.isdir(path):
+        compact = model_fingerprint(os.path.join(path, COMPACT_FILENAME))
+        forest = model_fingerprint(os.path.join(path, METADATA_FILENAME))
+        return f'{forest}+{compact}' if compact else forest
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ''
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    fingerprint = _fingerprints.get(key)
+    if fingerprint is None:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        fingerprint = _fingerprints[key] = digest.hexdigest()
+    return fingerprint
+
+def prepare_model(model):
+    """
+    Validasi urutan kolom model sekali saat load, lalu hapus feature_names_in_
+    agar scoring bisa memakai array NumPy tanpa validasi nama kolom per request.
+    """
+    names = getattr(model, 'feature_names_in_', None)
+    if names is not None:
+        if list(names) != FEATURE_COLUMNS:
+            raise ValueError(f"Urutan fitur model tidak sesuai FEATURE_COLUMNS: {list(names)}")
+        del model.feature_names_in_
+    return model
+
+def features_to_row(features):
+    """Isi buffer (1, n_features) float32 milik thread ini dengan nilai fitur sesuai FEATURE_COLUMNS"""
+    row = getattr(_row_buffer, 'row', None)
+    if row is None:
+        row = _row_buffer.row = np.empty((1, len(FEATURE_COLUMNS)), dtype=np.float32)
+    for i, name in enumerate(FEATURE_COLUMNS):
+        row[0, i] = features[name]
+    return row
+
+def score_rows(model, rows):
+    """Satu kali predict_proba; return (labels, confidences) dari kelas dengan probabilitas tertinggi"""
+    probabilities = model.predict_proba(rows)
+    best = np.argmax(probabilities, axis=1)
+    return model.classes_[best], probabilities[np.arange(len(best)), best]
+
+def is_whitelisted(url, parsed=None):
+    """Cek apakah hostname URL (atau parent domain-nya) ada di allowlist domain legitimate/pendidikan"""
+    if parsed is None:
+        parsed = parse_url(url)
+    return get_allowlist().contains(parsed.canonical.host_key)
+
+def apply_guardrail(prediction, confidence, features):
+    """
+    Guardrail anti false-positive (tanpa whitelist):
+    Jika hampir semua sinyal model menunjukkan "normal/aman" dan confidence phishing tidak terlalu tinggi,
+    jangan langsung cap phishing. Ini khusus untuk URL "bersih" seperti dashboard SaaS yang sering false positive.
+    """
+    if int(prediction) == 1 and confidence < GUARDRAIL_THRESHOLD:
+        looks_clean = (
+            features.get('SSLfinal_State') == 1
+            and features.get('having_IP_Address') == 1
+            and features.get('Shortining_Service') == -1
+            and features.get('having_At_Symbol') == -1
+            and features.get('double_slash_redirecting') == -1
+            and features.get('Prefix_Suffix') == -1
+            and features.get('having_Sub_Domain') == 0
+            and features.get('Domain_registeration_length') == -1
+            and features.get('HTTPS_token') == -1
+            and features.get('Abnormal_URL') == -1
+            and features.get('URL_Length') == 0
+            # Jika URL sudah punya path/konten request, jangan dianggap "bersih" (sering dipakai phishing pages)
+            and features.get('Request_URL') == -1
+        )
+        if looks_clean:
+            return 0, max(0.70, 1 - confidence)
+    return prediction, confidence
+
+def apply_guardrail_frame(predictions, confidences, features):
+    """Versi vektor dari apply_guardrail untuk DataFrame fitur hasil extract_model_features_frame"""
+    predictions = np.asarray(predictions)
+    confidences = np.asarray(confidences, dtype=float)
+    looks_clean = (
+        (features['SSLfinal_State'] == 1)
+        & (features['having_IP_Address'] == 1)
+        & (features['Shortining_Service'] == -1)
+        & (features['having_At_Symbol'] == -1)
+        & (features['double_slash_redirecting'] == -1)
+        & (features['Prefix_Suffix'] == -1)
+        & (features['having_Sub_Domain'] == 0)
+        & (features['Domain_registeration_length'] == -1)
+        & (features['HTTPS_token'] == -1)
+        & (features['Abnormal_URL'] == -1)
+        & (features['URL_Length'] == 0)
+        & (features['Request_URL'] == -1)
+    ).to_numpy()
+    override = (predictions.astype(int) == 1) & (confidences < GUARDRAIL_THRESHOLD) & looks_clean
+    new_predictions = np.where(override, 0, predictions)
+    new_confidences = np.where(override, np.maximum(0.70, 1 - confidences), confidences)
+    return new_predictions, new_confidences
+
+# Suffix pendidikan/pemerintah: prediksi phishing boleh diturunkan jika URL terlihat aman
+SAFE_SUFFIXES = frozenset({'ac.id', 'edu', 'sch.id', 'go.id'})
+
+def apply_url_rules(prediction, confidence, parsed, features):
+    """
+    Aturan setelah model (dipakai UI dan REST API), `features` dari extract_url_features:
+    Rule 1 melindungi domain akademik/pemerintah dari false positive berlebihan,
+    Rule 2 menaikkan URL judi/gaming berisiko tinggi menjadi phishing.
+    Fitur probe yang tidak ada (extract_url_features dengan network=False) tidak dihitung
+    sebagai sinyal aman.
+    """
+    # Rule 1: Lindungi domain akademik/pemerintah dari false positive berlebihan
+    suffix = parsed.extracted.suffix.lower()  # contoh: "ac.id"
+    if prediction == 1 and suffix in SAFE_SUFFIXES and features:
+        # Jika URL terlihat cukup aman menurut fitur, turunkan menjadi LEGITIMATE / waspada
+        safe_signals = 0
+        if features.get('https_used') == 1:
+            safe_signals += 1
+        if features.get('ip_in_domain') == 0:
+            safe_signals += 1
+        if features.get('at_symbol') == 0:
+            safe_signals += 1
+        if features.get('suspicious_words', 0) == 0:
+            safe_signals += 1
+        if 'redirect_count' in features and features['redirect_count'] <= 1:
+            safe_signals += 1
+
+        if safe_signals >= 4 and (confidence is not None) and confidence <= 0.97:
+            prediction = 0
+            # turunkan confidence sehingga tampil sebagai LEGITIMATE (Sedang), bukan Aman penuh
+            confidence = max(0.70, min(confidence, 0.85))
+
+    # Rule 2: Tingkatkan deteksi untuk URL judi/gaming berisiko tinggi
+    if features and features.get('is_judol') == 1 and prediction == 0:
+        prediction = 1
+        if confidence is None or confidence < 0.85:
+            confidence = 0.88
+
+    return prediction, confidence
+
+def predict_phishing_with_model(url, model, parsed=None):
+    """
+    Predict phishing using the trained model.
+
+    Returns (prediction, confidence); prediction None jika model tidak tersedia.
+    Error ekstraksi fitur/prediksi diteruskan ke pemanggil.
+    """
+    if parsed is None:
+        parsed = parse_url(url)
+    with tracing.span('allowlist'):
+        whitelisted = is_whitelisted(url, parsed)
+    if whitelisted:
+        return 0, 0.95  # Legitimate dengan confidence tinggi
+
+    if model is None:
+        return None, 0.0
+
+    with tracing.span('model_features'):
+        features = extract_model_features(url, parsed)
+
+    # Label dan confidence diturunkan dari satu predict_proba (tanpa predict terpisah)
+    with tracing.span('model_score', model=type(model).__name__):
+        labels, confidences = score_rows(model, features_to_row(features))
+
+    return apply_guardrail(labels[0], confidences[0], features)
@@ -0,0 +1,47 @@
+"""
+Public Suffix List offline untuk tldextract.
+
+Daftar suffix disimpan di repo (data/public_suffix_list.dat) dan di-compile menjadi
+trie satu kali per proses. Tidak ada fetch ke publicsuffix.org dan tidak ada cache disk,
+sehingga aman dipakai di deployment tanpa internet.
+
+Update daftar: unduh https://publicsuffix.org/list/public_suffix_list.dat ke data/.
+"""
+import os
+import pathlib
+import threading
+
+PUBLIC_SUFFIX_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'public_suffix_list.dat')
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor():
+    """TLDExtract level modul; trie suffix dibangun saat pertama dipanggil, lalu dipakai ulang"""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                # tldextract (dan requests di dalamnya) baru di-import saat parse pertama
+                import tldextract
+                path = os.path.abspath(PUBLIC_SUFFIX_FILE)
+                # Tanpa file vendored, pakai snapshot bawaan paket tldextract (tetap offline)
+                urls = (pathlib.Path(path).as_uri(),) if os.path.exists(path) else ()
+                extractor = tldextract.TLDExtract(
+                    suffix_list_urls=urls, cache_dir=None, fallback_to_snapshot=True
+                )
+                # Paksa compile trie sekarang, bukan pada request pertama
+                extractor('example.com')
+                _extractor = extractor
+    return _extractor
+
+
+def extract(url):
+    """Pengganti tldextract.extract (subdomain, domain, suffix) dengan daftar suffix offline"""
+    return get_extractor()(url)
+
+
+def registered_domain(extracted):
+    """domain.suffix dari hasil extract, misalnya example.co.id ('' jika tidak ada)"""
+    return '.'.join(p for p in [extracted.domain, extracted.suffix] if p)
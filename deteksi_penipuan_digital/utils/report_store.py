@@ -0,0 +1,164 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from canonical_url import canonicalize
+
+REPORT_DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'reported_phishing_urls.db')
+# File JSON lama; isinya diimpor sekali saat database pertama kali dibuat
+LEGACY_REPORT_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'reported_phishing_urls.json')
+
+# Interval minimum (detik) untuk mengambil laporan baru dari sesi/proses lain
+REFRESH_INTERVAL = 1.0
+
+# Versi fungsi report_key; jika berubah, url_key lama dihitung ulang dari kolom url
+KEY_VERSION = 1
+
+
+def report_key(url):
+    """Kunci unik laporan: URL kanonik (lihat canonical_url.canonicalize)"""
+    return canonicalize(url).url
+
+
+class ReportStore:
+    """
+    Penyimpanan URL phishing yang dilaporkan pengguna (SQLite mode WAL).
+
+    - Setiap laporan adalah satu INSERT (append-only, kunci unik URL ternormalisasi),
+      tanpa menulis ulang seluruh daftar
+    - Lookup memakai set di memori; laporan baru dari proses lain diambil secara
+      inkremental berdasarkan id terakhir yang sudah dibaca
+    """
+
+    def __init__(self, path=REPORT_DB_FILE, legacy_file=LEGACY_REPORT_FILE):
+        self.path = path
+        self.legacy_file = legacy_file
+        self._lock = threading.Lock()
+        self._conn = None
+        self._keys = set()
+        self._last_id = 0
+        self._last_refresh = 0.0
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS reported_urls ('
+                ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+                ' url_key TEXT NOT NULL UNIQUE,'
+                ' url TEXT NOT NULL,'
+                ' reported_at REAL NOT NULL)'
+            )
+            conn.commit()
+            self._conn = conn
+            self._import_legacy(conn)
+            self._migrate_keys(conn)
+        return self._conn
+
+    def _import_legacy(self, conn):
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+        if conn.execute('SELECT 1 FROM reported_urls LIMIT 1').fetchone():
+            return
+        try:
+            with open(self.legacy_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        conn.executemany(
+            'INSERT OR IGNORE INTO reported_urls (url_key, url, reported_at) VALUES (?, ?, ?)',
+            [(report_key(u), u, now) for u in data if isinstance(u, str) and u.strip()]
+        )
+        conn.commit()
+
+    def _migrate_keys(self, conn):
+        """Hitung ulang url_key jika database dibuat dengan versi report_key yang lebih lama"""
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version == KEY_VERSION:
+            return
+        rows = conn.execute('SELECT id, url FROM reported_urls ORDER BY id').fetchall()
+        seen = set()
+        for row_id, url in rows:
+            key = report_key(url)
+            if key in seen:
+                conn.execute('DELETE FROM reported_urls WHERE id = ?', (row_id,))
+                continue
+            seen.add(key)
+            # Kunci sementara dulu agar UPDATE tidak bentrok dengan constraint UNIQUE
+            conn.execute('UPDATE reported_urls SET url_key = ? WHERE id = ?', (f'#{row_id}', row_id))
+        for row_id, url in rows:
+            conn.execute('UPDATE reported_urls SET url_key = ? WHERE id = ?', (report_key(url), row_id))
+        conn.execute(f'PRAGMA user_version = {KEY_VERSION}')
+        conn.commit()
+
+    def _refresh(self, conn):
+        rows = conn.execute(
+            'SELECT id, url_key FROM reported_urls WHERE id > ? ORDER BY id', (self._last_id,)
+        ).fetchall()
+        for row_id, key in rows:
+            self._keys.add(key)
+            self._last_id = row_id
+        self._last_refresh = time.monotonic()
+
+    def refresh(self, force=False):
+        """Ambil laporan yang ditambahkan sejak refresh terakhir"""
+        with self._lock:
+            if force or time.monotonic() - self._last_refresh >= REFRESH_INTERVAL:
+                try:
+                    self._refresh(self._connect())
+                except sqlite3.Error:
+                    pass
+
+    def contains(self, url):
+        self.refresh()
+        return report_key(url) in self._keys
+
+    def __contains__(self, url):
+        return self.contains(url)
+
+    def __len__(self):
+        self.refresh()
+        return len(self._keys)
+
+    def keys(self):
+        """Salinan semua kunci laporan (URL ternormalisasi)"""
+        self.refresh(force=True)
+        with self._lock:
+            return set(self._keys)
+
+    def add(self, url):
+        """Catat URL sebagai phishing; laporan ganda diabaikan"""
+        key = report_key(url)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR IGNORE INTO reported_urls (url_key, url, reported_at) VALUES (?, ?, ?)',
+                (key, url.strip(), time.time())
+            )
+            conn.commit()
+            self._refresh(conn)
+            self._keys.add(key)
+
+    @property
+    def version(self):
+        """Id laporan terakhir yang sudah dibaca; berubah setiap ada laporan baru"""
+        self.refresh()
+        return self._last_id
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_report_store():
+    """Report store level modul, dipakai bersama oleh semua sesi dalam satu proses"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ReportStore()
+    return _store
@@ -0,0 +1,329 @@
+"""
+Tracing ringan per tahap analisis (span berbasis context manager).
+
+    with tracing.trace('phishing_detection', url=url) as t:
+        with tracing.span('parse_url'):
+            ...
+    t.breakdown()  # daftar tahap + durasi untuk ditampilkan di UI
+
+- Span hanya dicatat jika ada trace aktif; tanpa trace, span() hampir tanpa biaya
+  (satu lookup contextvar), jadi batch scan dan benchmark tidak terpengaruh
+- Trace aktif disimpan di contextvars. Pekerjaan yang dijalankan di thread lain (probe
+  jaringan) dibungkus dengan propagate() agar span-nya masuk ke trace yang sama
+- Trace yang selesai dikirim ke semua exporter: ring buffer di memori, baris log JSON
+  (logger 'deteksi.tracing'), dan OpenTelemetry jika paketnya terpasang. Exporter yang
+  mengirim keluar proses (log, OpenTelemetry) memotong atribut URL menjadi scheme://host/path
+  (tanpa userinfo, query, fragment) agar token sesi/email di URL tidak ikut tersimpan
+"""
+import contextvars
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit, urlunsplit
+
+RING_BUFFER_SIZE = 500
+
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+_current_span = contextvars.ContextVar('current_span', default=None)
+_ids = itertools.count(1)
+
+logger = logging.getLogger('deteksi.tracing')
+
+
+class Span:
+    __slots__ = ('name', 'span_id', 'parent_id', 'attributes', 'start', 'end', 'start_ns', 'thread', 'error')
+
+    def __init__(self, name, parent_id, attributes):
+        self.name = name
+        self.span_id = next(_ids)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.thread = threading.current_thread().name
+        self.error = None
+        self.start_ns = time.time_ns()
+        self.start = time.perf_counter()
+        self.end = None
+
+    @property
+    def duration_ms(self):
+        return None if self.end is None else (self.end - self.start) * 1000
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'duration_ms': None if self.end is None else round(self.duration_ms, 3),
+            'thread': self.thread,
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+
+class Trace:
+    """Kumpulan span satu request; span root bernama sama dengan trace"""
+
+    def __init__(self, name, attributes):
+        self.trace_id = f'{time.time_ns():x}-{next(_ids)}'
+        self.root = Span(name, None, attributes)
+        self.spans = [self.root]
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self.root.name
+
+    @property
+    def duration_ms(self):
+        return self.root.duration_ms
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def breakdown(self):
+        """
+        Daftar tahap berurutan (waktu mulai) dengan kedalaman di pohon span:
+        [{'name', 'depth', 'duration_ms', 'offset_ms', 'thread', 'error', 'attributes'}].
+        Span yang belum selesai (misalnya probe yang melewati deadline) ber-duration None.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        depth = {None: -1}
+        rows = []
+        for span in sorted(spans, key=lambda s: s.start):
+            depth[span.span_id] = depth.get(span.parent_id, -1) + 1
+            row = span.to_dict()
+            row['depth'] = depth[span.span_id]
+            row['offset_ms'] = round((span.start - self.root.start) * 1000, 3)
+            rows.append(row)
+        return rows
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'duration_ms': None if self.duration_ms is None else round(self.duration_ms, 3),
+            'spans': self.breakdown(),
+        }
+
+
+class _SpanContext:
+    __slots__ = ('trace', 'name', 'attributes', 'span', '_tokens')
+
+    def __init__(self, trace, name, attributes):
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.span = Span(self.name, parent.span_id if parent else None, self.attributes)
+        self.trace.add(self.span)
+        self._tokens = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.end = time.perf_counter()
+        if exc_type is not None:
+            self.span.error = exc_type.__name__
+        _current_span.reset(self._tokens)
+        return False
+
+
+class _NullSpan:
+    """Span pengganti saat tidak ada trace aktif"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, **attributes):
+    """Context manager satu tahap; dicatat di trace aktif (no-op jika tidak ada trace)"""
+    active = _current_trace.get()
+    if active is None:
+        return _NULL_SPAN
+    return _SpanContext(active, name, attributes)
+
+
+class _TraceContext:
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self._nested = None
+        self._tokens = None
+        self.trace = None
+
+    def __enter__(self):
+        if _current_trace.get() is not None:
+            self._nested = span(self.name, **self.attributes)
+            self._nested.__enter__()
+            self.trace = _current_trace.get()
+            return self.trace
+        self.trace = Trace(self.name, self.attributes)
+        self._tokens = (_current_trace.set(self.trace), _current_span.set(self.trace.root))
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._nested is not None:
+            return self._nested.__exit__(exc_type, exc, tb)
+        root = self.trace.root
+        root.end = time.perf_counter()
+        if exc_type is not None:
+            root.error = exc_type.__name__
+        _current_span.reset(self._tokens[1])
+        _current_trace.reset(self._tokens[0])
+        export(self.trace)
+        return False
+
+
+def trace(name, **attributes):
+    """
+    Context manager satu trace (satu request); `as` menghasilkan objek Trace. Saat selesai,
+    trace dikirim ke semua exporter. Trace bersarang tidak membuat trace baru (sama dengan span).
+    """
+    return _TraceContext(name, attributes)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def propagate(func):
+    """
+    Bungkus func agar berjalan dengan salinan context saat ini (trace & span aktif),
+    misalnya sebelum di-submit ke thread pool. Setiap pemanggilan propagate membuat salinan baru.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.run(func, *args, **kwargs)
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Exporter
+# ---------------------------------------------------------------------------
+
+def redact_url(value):
+    """scheme://host[:port]/path dari URL (userinfo, query, dan fragment dibuang)"""
+    try:
+        parts = urlsplit(value)
+        host = parts.hostname or ''
+        if parts.port:
+            host = f'{host}:{parts.port}'
+    except ValueError:
+        return '<url tidak valid>'
+    return urlunsplit((parts.scheme, host, parts.path, '', ''))
+
+
+def redact_attributes(attributes):
+    """Salinan atribut span; atribut 'url' dan nilai string berbentuk URL dipotong lewat redact_url"""
+    return {
+        key: redact_url(value) if isinstance(value, str) and (key == 'url' or '://' in value) else value
+        for key, value in attributes.items()
+    }
+
+
+class RingBufferExporter:
+    """Simpan trace terakhir di memori (untuk debugging/inspeksi dari proses yang sama)"""
+
+    def __init__(self, maxlen=RING_BUFFER_SIZE):
+        self._traces = deque(maxlen=maxlen)
+
+    def export(self, finished):
+        self._traces.append(finished.to_dict())
+
+    def recent(self, n=None):
+        traces = list(self._traces)
+        return traces if n is None else traces[-n:]
+
+
+class JsonLogExporter:
+    """Satu baris log JSON per trace (level INFO)"""
+
+    def __init__(self, log=logger):
+        self.log = log
+
+    def export(self, finished):
+        if self.log.isEnabledFor(logging.INFO):
+            data = finished.to_dict()
+            for row in data['spans']:
+                row['attributes'] = redact_attributes(row['attributes'])
+            self.log.info(json.dumps(data, default=str, sort_keys=True))
+
+
+class OpenTelemetryExporter:
+    """
+    Teruskan trace ke OpenTelemetry (paket opentelemetry-api; provider/exporter dikonfigurasi
+    oleh aplikasi). Span dibuat ulang dengan waktu mulai/selesai aslinya.
+    """
+
+    def __init__(self, tracer_name='deteksi_penipuan_digital'):
+        from opentelemetry import trace as otel_trace
+        self._otel = otel_trace
+        self.tracer = otel_trace.get_tracer(tracer_name)
+
+    def export(self, finished):
+        with finished._lock:
+            spans = sorted(finished.spans, key=lambda s: s.start)
+        created = {}
+        for s in spans:
+            parent = created.get(s.parent_id)
+            context = self._otel.set_span_in_context(parent) if parent is not None else None
+            attributes = {
+                k: v if isinstance(v, (str, bool, int, float)) else str(v)
+                for k, v in redact_attributes(s.attributes).items()
+            }
+            created[s.span_id] = self.tracer.start_span(
+                s.name, context=context, start_time=s.start_ns, attributes=attributes
+            )
+        for s in reversed(spans):
+            otel_span = created[s.span_id]
+            if s.error:
+                otel_span.set_attribute('error.type', s.error)
+            end = s.end if s.end is not None else time.perf_counter()
+            otel_span.end(end_time=s.start_ns + int((end - s.start) * 1e9))
+
+
+ring_buffer = RingBufferExporter()
+_exporters = [ring_buffer, JsonLogExporter()]
+try:
+    _exporters.append(OpenTelemetryExporter())
+except ImportError:
+    pass
+
+
+def set_exporters(exporters):
+    """Ganti daftar exporter (misalnya hanya ring buffer saat test/benchmark)"""
+    global _exporters
+    _exporters = list(exporters)
+
+
+def add_exporter(exporter):
+    _exporters.append(exporter)
+
+
+def export(finished):
+    for exporter in _exporters:
+        try:
+            exporter.export(finished)
+        except Exception:
+            # Tracing tidak boleh menggagalkan request
+            logger.debug('Exporter %s gagal', type(exporter).__name__, exc_info=True)
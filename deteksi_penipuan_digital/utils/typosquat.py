@@ -0,0 +1,132 @@
+import os
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+
+BRANDS_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'brand_domains.txt')
+
+# Jarak edit maksimum yang diindeks (deletion index ala SymSpell)
+MAX_EDIT_DISTANCE = 2
+
+# Karakter yang secara visual mirip huruf latin (homoglyph Cyrillic/Greek/IPA dan angka)
+HOMOGLYPHS = {
+    'а': 'a', 'е': 'e', 'о': 'o', 'р': 'p', 'с': 'c',
+    'х': 'x', 'у': 'y', 'і': 'i', 'ј': 'j', 'ԁ': 'd',
+    'һ': 'h', 'ѕ': 's', 'ԛ': 'q', 'ԝ': 'w', 'ɡ': 'g',
+    'ο': 'o', 'α': 'a', 'ν': 'v', 'ρ': 'p', 'ι': 'i',
+    'ı': 'i', '0': 'o', '1': 'l', '3': 'e', '5': 's', '7': 't', '@': 'a',
+}
+# Rangkaian huruf yang terlihat seperti satu huruf lain
+MULTI_CHAR_HOMOGLYPHS = [('rn', 'm'), ('vv', 'w'), ('cl', 'd')]
+
+
+def skeleton(label):
+    """
+    Normalisasi label domain untuk perbandingan visual: decode IDN (xn--),
+    hapus aksen, ganti homoglyph ke huruf latin, lalu lowercase.
+    """
+    label = label.lower()
+    if label.startswith('xn--'):
+        try:
+            label = label.encode('ascii').decode('idna')
+        except UnicodeError:
+            pass
+    label = unicodedata.normalize('NFKD', label)
+    label = ''.join(c for c in label if not unicodedata.combining(c))
+    label = ''.join(HOMOGLYPHS.get(c, c) for c in label)
+    for sequence, replacement in MULTI_CHAR_HOMOGLYPHS:
+        label = label.replace(sequence, replacement)
+    return label
+
+
+def _deletes(word, max_distance):
+    """Semua string hasil menghapus 0..max_distance karakter dari word"""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            for i in range(len(item)):
+                next_frontier.add(item[:i] + item[i + 1:])
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+class TyposquatIndex:
+    """
+    Index typo-squatting berbasis deletion index (SymSpell) atas skeleton nama brand.
+
+    Lookup membangkitkan varian delete dari domain yang dicek (jumlahnya hanya bergantung
+    pada panjang domain), sehingga biayanya hampir konstan walau daftar brand bertambah.
+    Kandidat diverifikasi dengan rasio SequenceMatcher seperti implementasi sebelumnya.
+    """
+
+    def __init__(self, brands=(), max_distance=MAX_EDIT_DISTANCE):
+        self.max_distance = max_distance
+        self.brand_names = set()
+        self.skeletons = {}
+        self._index = {}
+        for brand in brands:
+            name = brand.strip().lower().split('.')[0]
+            if not name or name in self.brand_names:
+                continue
+            self.brand_names.add(name)
+            brand_skeleton = skeleton(name)
+            self.skeletons.setdefault(brand_skeleton, set()).add(name)
+            for variant in _deletes(brand_skeleton, max_distance):
+                self._index.setdefault(variant, set()).add(brand_skeleton)
+        self.max_length = max((len(s) for s in self.skeletons), default=0)
+
+    def __len__(self):
+        return len(self.brand_names)
+
+    def match(self, domain, threshold=0.8):
+        """Return nama brand yang ditiru oleh domain, atau None"""
+        domain = domain.lower()
+        if not domain or domain in self.brand_names:
+            return None
+        domain_skeleton = skeleton(domain)
+        # Homoglyph/IDN: tampilannya sama persis dengan brand, tapi string aslinya beda
+        if domain_skeleton in self.skeletons:
+            return sorted(self.skeletons[domain_skeleton])[0]
+        if len(domain_skeleton) > self.max_length + self.max_distance:
+            return None
+        candidates = set()
+        for variant in _deletes(domain_skeleton, self.max_distance):
+            candidates |= self._index.get(variant, set())
+        for candidate in sorted(candidates):
+            if SequenceMatcher(None, domain_skeleton, candidate).ratio() >= threshold:
+                return sorted(self.skeletons[candidate])[0]
+        return None
+
+    def is_typo_domain(self, domain, threshold=0.8):
+        return 1 if self.match(domain, threshold) else 0
+
+
+def read_brands(path):
+    """Baca daftar brand (satu domain per baris, '#' komentar, format 'rank,domain' diterima)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                yield line.rsplit(',', 1)[-1]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_typosquat_index():
+    """Index brand level modul, dibangun sekali per proses dari BRANDS_FILE"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = TyposquatIndex(read_brands(BRANDS_FILE) if os.path.exists(BRANDS_FILE) else ())
+    return _index
+
+
+def is_typo_domain(domain, threshold=0.8):
+    """Cek apakah domain mirip dengan domain brand populer (typo-squatting / homoglyph)"""
+    return get_typosquat_index().is_typo_domain(domain, threshold)
@@ -1,39 +1,44 @@
 import re
-import tldextract
-import requests
-from urllib.parse import urlparse
-import whois
 from datetime import datetime
-from difflib import SequenceMatcher
-import socket
+from concurrent.futures import ThreadPoolExecutor, wait
+from whois_cache import WhoisCache, MISS
+from whois_client import lookup_creation_date
+from typosquat import is_typo_domain
+from url_parse import parse_url, url_port
+import tracing
+import metrics
 
-POPULAR_DOMAINS = [
-    'microsoft.com', 'google.com', 'facebook.com', 'apple.com', 'amazon.com',
-    'paypal.com', 'ebay.com', 'yahoo.com', 'instagram.com', 'twitter.com',
-    'linkedin.com', 'netflix.com', 'whatsapp.com', 'telegram.org', 'bankofamerica.com',
-    'wellsfargo.com', 'chase.com', 'gmail.com', 'outlook.com', 'icloud.com'
-]
+# Batas waktu total (detik) untuk seluruh probe jaringan per URL.
+# Probe berjalan paralel, jadi latensi terburuk = probe paling lambat, bukan jumlahnya.
+PROBE_DEADLINE = 6
+WHOIS_TIMEOUT = 5
 
-def is_typo_domain(domain, threshold=0.8):
-    """Cek apakah domain mirip dengan domain populer (typo-squatting)"""
-    domain = domain.lower()
-    for popular in POPULAR_DOMAINS:
-        base = popular.split('.')[0]
-        ratio = SequenceMatcher(None, domain, base).ratio()
-        if ratio >= threshold and domain != base:
-            return 1
-    return 0
+# Nama fitur yang diisi oleh probe jaringan (WHOIS, HEAD redirect, HEAD favicon)
+NETWORK_PROBES = ['domain_age', 'redirect_count', 'favicon_domain_match']
 
-def extract_url_features(url):
+# Thread pool bersama untuk semua sesi Streamlit; probe yang melewati deadline
+# tetap selesai sendiri di background karena punya timeout masing-masing.
+_probe_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='url-probe')
+
+# Cache WHOIS persisten (data/whois_cache.db), dipakai bersama oleh semua sesi
+_whois_cache = WhoisCache()
+
+def extract_url_features(url, parsed=None, network=True):
     """
     Ekstraksi fitur-fitur dari URL untuk deteksi phishing
+    
+    `parsed` (hasil parse_url) dipakai ulang jika sudah ada; jika tidak, URL di-parse di sini.
+    network=False melewati probe jaringan (WHOIS, redirect, favicon): fitur probe dan flag
+    *_timed_out tidak ada di hasil, misalnya untuk REST API yang hanya memakai fitur URL.
     """
     features = {}
     
     try:
         # Parse URL
-        parsed_url = urlparse(url)
-        extracted = tldextract.extract(url)
+        if parsed is None:
+            parsed = parse_url(url)
+        parsed_url = parsed.parts
+        extracted = parsed.extracted
         
         # Basic URL features
         features['url_length'] = len(url)
@@ -54,20 +59,29 @@ def extract_url_features(url):
         features['hash_count'] = url.count('#')
         features['percent_count'] = url.count('%')
         
+        # Probe jaringan (WHOIS, redirect, favicon) dijalankan bersamaan
+        if network:
+            with tracing.span('network_probes'):
+                probe_results, probe_timeouts = run_network_probes(url, parsed.canonical.domain_key)
+        
         # Domain features
-        features['domain_age'] = get_domain_age(extracted.domain + '.' + extracted.suffix)
+        if network:
+            features['domain_age'] = probe_results['domain_age']
         features['https_used'] = 1 if parsed_url.scheme == 'https' else 0
-        features['port_present'] = 1 if parsed_url.port else 0
+        features['port_present'] = 1 if url_port(parsed_url) else 0
         
         # Suspicious patterns
         features['ip_in_domain'] = 1 if re.search(r'\d+\.\d+\.\d+\.\d+', extracted.domain) else 0
         features['suspicious_words'] = count_suspicious_words(url.lower())
-        features['redirect_count'] = count_redirects(url)
+        if network:
+            features['redirect_count'] = probe_results['redirect_count']
         
         # URL structure
         features['url_depth'] = len([x for x in parsed_url.path.split('/') if x])
-        features['favicon_domain_match'] = check_favicon_domain(url)
-        features['is_typo_domain'] = is_typo_domain(extracted.domain)
+        if network:
+            features['favicon_domain_match'] = probe_results['favicon_domain_match']
+        with tracing.span('typosquat'):
+            features['is_typo_domain'] = is_typo_domain(extracted.domain)
         # Deteksi konten judi / gaming berisiko tinggi di URL
         gambling_keywords = [
             'judol', 'slot', 'casino', 'bet', 'betting', 'gambling',
@@ -76,6 +90,11 @@ def extract_url_features(url):
         lower_url = url.lower()
         features['is_judol'] = 1 if any(g in lower_url for g in gambling_keywords) else 0
         
+        # Flag per probe: 1 jika probe tidak selesai sebelum deadline (nilai fitur = default 0)
+        if network:
+            for name in NETWORK_PROBES:
+                features[f'{name}_timed_out'] = probe_timeouts[name]
+        
     except Exception as e:
         # Return default values if extraction fails
         features = {key: 0 for key in [
@@ -86,32 +105,53 @@ def extract_url_features(url):
             'https_used', 'port_present', 'ip_in_domain', 'suspicious_words',
             'redirect_count', 'url_depth', 'favicon_domain_match', 'is_typo_domain',
             'is_judol'
-        ]}
+        ] + [f'{name}_timed_out' for name in NETWORK_PROBES]}
     
     return features
 
+def run_network_probes(url, domain, deadline=PROBE_DEADLINE):
+    """
+    Jalankan semua probe jaringan secara paralel di bawah satu deadline.
+    
+    Returns (results, timed_out): nilai fitur per probe dan flag 1/0 apakah
+    probe tersebut melewati deadline. Probe yang timeout atau error bernilai 0.
+    """
+    # propagate: span probe di thread pool tetap tercatat di trace request ini
+    futures = {
+        'domain_age': _probe_executor.submit(tracing.propagate(get_domain_age), domain),
+        'redirect_count': _probe_executor.submit(tracing.propagate(count_redirects), url),
+        'favicon_domain_match': _probe_executor.submit(tracing.propagate(check_favicon_domain), url),
+    }
+    wait(futures.values(), timeout=deadline)
+    
+    results = {}
+    timed_out = {}
+    for name, future in futures.items():
+        if future.done():
+            timed_out[name] = 0
+            failed = future.exception() is not None
+            results[name] = 0 if failed else future.result()
+            metrics.NETWORK_PROBES.inc(probe=name, outcome='error' if failed else 'ok')
+        else:
+            timed_out[name] = 1
+            results[name] = 0
+            metrics.NETWORK_PROBES.inc(probe=name, outcome='timeout')
+    return results, timed_out
+
 def get_domain_age(domain):
-    """Get domain age in days"""
-    try:
-        # Set timeout untuk WHOIS query
-        socket.setdefaulttimeout(5)  # 5 detik timeout
-        
-        w = whois.whois(domain)
-        if w.creation_date:
-            if isinstance(w.creation_date, list):
-                creation_date = w.creation_date[0]
-            else:
-                creation_date = w.creation_date
-            age = (datetime.now() - creation_date).days
-            return age if age > 0 else 0
-    except (socket.timeout, Exception) as e:
-        # Log error jika diperlukan
-        # print(f"WHOIS timeout for {domain}: {e}")
-        pass
-    finally:
-        # Reset timeout ke default
-        socket.setdefaulttimeout(None)
-    return 0
+    """Get domain age in days (hasil WHOIS di-cache per registered domain)"""
+    with tracing.span('whois', domain=domain) as span:
+        creation_date = _whois_cache.get(domain)
+        span.set(cache_hit=creation_date is not MISS)
+        if creation_date is MISS:
+            # Client WHOIS dengan timeout per panggilan (tidak menyentuh socket.setdefaulttimeout),
+            # aman dipanggil paralel dari thread pool probe
+            creation_date = lookup_creation_date(domain, timeout=WHOIS_TIMEOUT)
+            _whois_cache.set(domain, creation_date)
+    if creation_date is None:
+        return 0
+    age = (datetime.now() - creation_date).days
+    return age if age > 0 else 0
 
 def count_suspicious_words(url):
     """Count suspicious words in URL"""
@@ -131,19 +171,23 @@ def count_suspicious_words(url):
 
 def count_redirects(url):
     """Count number of redirects"""
-    try:
-        response = requests.head(url, allow_redirects=False, timeout=5)
-        if response.status_code in [301, 302, 303, 307, 308]:
-            return 1
-    except:
-        pass
-    return 0
+    with tracing.span('redirect_head'):
+        try:
+            import requests  # di-import saat probe pertama, bukan saat app start
+            response = requests.head(url, allow_redirects=False, timeout=5)
+            if response.status_code in [301, 302, 303, 307, 308]:
+                return 1
+        except:
+            pass
+        return 0
 
 def check_favicon_domain(url):
     """Check if favicon domain matches main domain"""
-    try:
-        favicon_url = f"{url}/favicon.ico"
-        response = requests.head(favicon_url, timeout=5)
-        return 1 if response.status_code == 200 else 0
-    except:
-        return 0 
\ No newline at end of file
+    with tracing.span('favicon_head'):
+        try:
+            import requests
+            favicon_url = f"{url}/favicon.ico"
+            response = requests.head(favicon_url, timeout=5)
+            return 1 if response.status_code == 200 else 0
+        except:
+            return 0 
\ No newline at end of file
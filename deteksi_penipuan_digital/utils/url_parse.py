@@ -0,0 +1,25 @@
+from collections import namedtuple
+from urllib.parse import urlparse
+
+from public_suffix import extract
+from canonical_url import canonicalize
+
+# url       : URL asli dari input pengguna (fitur model tetap dihitung dari sini)
+# parts     : hasil urllib.parse.urlparse(url)
+# extracted : hasil extract suffix (subdomain, domain, suffix)
+# canonical : CanonicalURL untuk kunci cache, allowlist, blocklist, dan report
+ParsedURL = namedtuple('ParsedURL', ['url', 'parts', 'extracted', 'canonical'])
+
+
+def parse_url(url):
+    """Parse URL satu kali; hasilnya diteruskan ke semua tahap analisis"""
+    extracted = extract(url)
+    return ParsedURL(url, urlparse(url), extracted, canonicalize(url, extracted))
+
+
+def url_port(parts):
+    """parts.port, atau None jika port tidak valid (bukan angka / di luar 0-65535) alih-alih ValueError"""
+    try:
+        return parts.port
+    except ValueError:
+        return None
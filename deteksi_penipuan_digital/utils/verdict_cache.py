@@ -0,0 +1,159 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+VERDICT_CACHE_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'verdict_cache.db')
+
+# Verdict bergantung pada probe jaringan (redirect, favicon, umur domain) yang bisa berubah,
+# jadi TTL dibuat jauh lebih pendek dari cache WHOIS
+DEFAULT_TTL = 3600
+MAX_MEMORY_ENTRIES = 10000
+MAX_SHARED_ENTRIES = 100000
+
+# Penanda "tidak ada di cache"
+MISS = object()
+
+
+class VerdictCache:
+    """
+    Cache hasil akhir analisis URL: (prediction, confidence, features).
+
+    - Kunci: URL persis seperti yang dianalisis (fitur model dihitung dari URL mentah)
+    - Tier 1: LRU di memori proses (OrderedDict), lookup tanpa I/O
+    - Tier 2 (opsional, jika `path` diberikan): SQLite WAL yang dipakai bersama antar proses
+    - Setiap entri membawa `generation` (hash model, versi report store, allowlist, blocklist);
+      entri dengan generation berbeda dianggap MISS sehingga ganti model, laporan baru, atau
+      build ulang allowlist/blocklist otomatis menginvalidasi
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_entries=MAX_MEMORY_ENTRIES,
+                 max_shared_entries=MAX_SHARED_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_shared_entries = max_shared_entries
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._conn = None
+        self._writes_since_evict = 0
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS verdict_cache ('
+                ' url_key TEXT PRIMARY KEY,'
+                ' generation TEXT NOT NULL,'
+                ' verdict TEXT NOT NULL,'
+                ' expires_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_verdict_expires ON verdict_cache(expires_at)')
+            self._conn = conn
+        return self._conn
+
+    def __len__(self):
+        return len(self._memory)
+
+    def get(self, key, generation):
+        """Return (prediction, confidence, features) atau MISS jika tidak ada/kedaluwarsa/beda generation"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, entry_generation, verdict = entry
+                if expires_at > now and entry_generation == generation:
+                    self._memory.move_to_end(key)
+                    return _copy_verdict(verdict)
+                del self._memory[key]
+            if self.path is None:
+                return MISS
+            try:
+                row = self._connect().execute(
+                    'SELECT verdict, expires_at FROM verdict_cache WHERE url_key = ? AND generation = ?',
+                    (key, generation)
+                ).fetchone()
+            except sqlite3.Error:
+                return MISS
+            if row is None or row[1] <= now:
+                return MISS
+            prediction, confidence, features = json.loads(row[0])
+            verdict = (prediction, confidence, features)
+            self._remember(key, (row[1], generation, verdict))
+            return _copy_verdict(verdict)
+
+    def set(self, key, generation, prediction, confidence, features):
+        """Simpan verdict untuk URL `key` pada generation saat ini"""
+        expires_at = time.time() + self.ttl
+        verdict = (prediction, confidence, dict(features) if features else features)
+        with self._lock:
+            self._remember(key, (expires_at, generation, verdict))
+            if self.path is None:
+                return
+            try:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO verdict_cache (url_key, generation, verdict, expires_at)'
+                    ' VALUES (?, ?, ?, ?)',
+                    (key, generation, json.dumps(verdict, default=_json_default), expires_at)
+                )
+                self._writes_since_evict += 1
+                if self._writes_since_evict >= 100:
+                    self._writes_since_evict = 0
+                    self._evict(conn)
+                conn.commit()
+            except (sqlite3.Error, TypeError, ValueError):
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, conn):
+        conn.execute('DELETE FROM verdict_cache WHERE expires_at <= ?', (time.time(),))
+        count = conn.execute('SELECT COUNT(*) FROM verdict_cache').fetchone()[0]
+        excess = count - self.max_shared_entries
+        if excess > 0:
+            # Entri yang paling cepat kedaluwarsa = yang paling lama ditulis
+            conn.execute(
+                'DELETE FROM verdict_cache WHERE url_key IN ('
+                ' SELECT url_key FROM verdict_cache ORDER BY expires_at ASC LIMIT ?)',
+                (excess,)
+            )
+
+
+def _copy_verdict(verdict):
+    """Salinan dict fitur agar pemanggil tidak bisa mengubah isi cache"""
+    prediction, confidence, features = verdict
+    return prediction, confidence, dict(features) if features else features
+
+
+def _json_default(value):
+    # Nilai NumPy (misalnya np.int64 dari fitur) diserialisasi sebagai angka biasa
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f'Tidak bisa diserialisasi: {type(value).__name__}')
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_verdict_cache():
+    """Verdict cache level modul (memori + SQLite bersama), dipakai semua sesi dalam satu proses"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = VerdictCache(VERDICT_CACHE_FILE)
+    return _cache
@@ -0,0 +1,157 @@
+"""
+Warm-up proses server: load model, daftar suffix, allowlist, blocklist, index typosquat,
+report store, lalu jalankan satu prediksi dummy sebelum sesi pertama dilayani.
+
+Status kesiapan bisa dicek load balancer lewat server HTTP kecil terpisah:
+    GET /healthz -> 200 selama proses hidup
+    GET /readyz  -> 200 setelah warm-up selesai, 503 sebelumnya (atau jika warm-up gagal)
+    GET /metrics -> metrik operasional (utils/metrics.py) dalam format teks Prometheus
+
+Contoh (cek manual waktu warm-up):
+    python utils/warmup.py
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Hanya dependensi ringan di level modul: app.py meng-import modul ini di setiap run script
+# Streamlit, jadi stack phishing (numpy, model, index) baru di-import di thread warm-up
+from metrics import REGISTRY
+
+READINESS_HOST = '0.0.0.0'
+READINESS_PORT = 8502
+
+# URL dummy: tidak ada di allowlist agar seluruh jalur fitur + model ikut dijalankan
+WARMUP_URL = 'http://secure-login.paypa1-verify.invalid/account/update?id=1'
+
+_ready = threading.Event()
+_state = {'status': 'pending', 'timings': {}, 'error': None}
+_warmup_lock = threading.Lock()
+_start_lock = threading.Lock()
+_warmup_thread = None
+_server = None
+
+
+def _step(name, func):
+    start = time.perf_counter()
+    result = func()
+    _state['timings'][name] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def warm_up():
+    """
+    Jalankan semua langkah warm-up (sinkron). Aman dipanggil berkali-kali; setelah
+    berhasil, panggilan berikutnya langsung return. Return status warm-up.
+    """
+    with _warmup_lock:
+        if _ready.is_set():
+            return readiness_status()
+        _state['status'] = 'warming'
+        _state['error'] = None
+        try:
+            import phishing_detector
+            from public_suffix import get_extractor
+            from allowlist import get_allowlist
+            from blocklist import get_blocklist
+            from typosquat import get_typosquat_index
+            from report_store import get_report_store
+            from verdict_cache import get_verdict_cache
+
+            model = _step('model', phishing_detector.get_model)
+            _step('public_suffix', get_extractor)
+            _step('allowlist', get_allowlist)
+            _step('blocklist', get_blocklist)
+            _step('typosquat', get_typosquat_index)
+            _step('report_store', lambda: get_report_store().refresh(force=True))
+            _step('verdict_cache', lambda: get_verdict_cache().get(WARMUP_URL, ''))
+            _step('prediction', lambda: phishing_detector.predict_phishing_with_model(WARMUP_URL, model))
+        except Exception as e:
+            _state['status'] = 'failed'
+            _state['error'] = f'{type(e).__name__}: {e}'
+            return readiness_status()
+        _state['status'] = 'ready'
+        _ready.set()
+    return readiness_status()
+
+
+def start_warm_up():
+    """Jalankan warm_up di thread background (sekali per proses); return thread-nya"""
+    global _warmup_thread
+    with _start_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=warm_up, name='warmup', daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def readiness_status():
+    return {
+        'status': _state['status'],
+        'ready': _ready.is_set(),
+        'timings': dict(_state['timings']),
+        'error': _state['error'],
+    }
+
+
+class _ReadinessHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/healthz':
+            self._send(200, {'status': 'ok'})
+        elif self.path == '/readyz':
+            status = readiness_status()
+            self._send(200 if status['ready'] else 503, status)
+        elif self.path == '/metrics':
+            self._send_text(200, REGISTRY.render_prometheus(), 'text/plain; version=0.0.4; charset=utf-8')
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def _send(self, code, payload):
+        self._send_text(code, json.dumps(payload), 'application/json')
+
+    def _send_text(self, code, text, content_type):
+        body = text.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Probe load balancer datang tiap beberapa detik; jangan penuhi log
+        pass
+
+
+def start_readiness_server(host=READINESS_HOST, port=READINESS_PORT):
+    """
+    Jalankan server /healthz, /readyz & /metrics di thread background (sekali per proses).
+    Return server, atau None jika port sudah dipakai (misalnya proses lain di host yang sama).
+    """
+    global _server
+    with _start_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _ReadinessHandler)
+            except OSError:
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name='readiness', daemon=True).start()
+    return _server
+
+
+def main():
+    status = warm_up()
+    print(json.dumps(status, indent=2))
+    sys.exit(0 if status['ready'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+CACHE_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'whois_cache.db')
+
+# TTL default: tanggal registrasi domain jarang berubah, jadi cache sukses disimpan lama.
+# Kegagalan (timeout, domain tidak ditemukan) disimpan lebih singkat agar cepat dicoba ulang.
+DEFAULT_TTL = 7 * 24 * 3600
+NEGATIVE_TTL = 3600
+MAX_ENTRIES = 50000
+# last_access (untuk LRU) hanya diperbarui jika sudah lebih tua dari ini, agar cache hit
+# tidak selalu menjadi transaksi tulis + commit
+ACCESS_REFRESH = 3600
+
+# Penanda "tidak ada di cache" (berbeda dengan None = hasil negatif yang ter-cache)
+MISS = object()
+
+
+class WhoisCache:
+    """
+    Cache WHOIS persisten (SQLite) dengan kunci registered domain.
+
+    - Entri sukses menyimpan tanggal pembuatan domain, berlaku selama `ttl` detik
+    - Entri gagal (negative caching) berlaku selama `negative_ttl` detik
+    - Jika jumlah entri melebihi `max_entries`, entri yang paling lama tidak diakses dihapus (LRU);
+      waktu akses dicatat dengan granularitas ACCESS_REFRESH detik
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl=DEFAULT_TTL, negative_ttl=NEGATIVE_TTL, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes_since_evict = 0
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS whois_cache ('
+                ' domain TEXT PRIMARY KEY,'
+                ' creation_ts REAL,'
+                ' fetched_at REAL NOT NULL,'
+                ' last_access REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_whois_last_access ON whois_cache(last_access)')
+            self._conn = conn
+        return self._conn
+
+    def get(self, domain):
+        """Return datetime pembuatan domain, None (hasil negatif), atau MISS jika tidak ada/kedaluwarsa"""
+        domain = domain.lower()
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    'SELECT creation_ts, fetched_at, last_access FROM whois_cache WHERE domain = ?', (domain,)
+                ).fetchone()
+                if row is None:
+                    return MISS
+                creation_ts, fetched_at, last_access = row
+                ttl = self.ttl if creation_ts is not None else self.negative_ttl
+                if now - fetched_at > ttl:
+                    return MISS
+                if now - last_access > ACCESS_REFRESH:
+                    conn.execute('UPDATE whois_cache SET last_access = ? WHERE domain = ?', (now, domain))
+                    conn.commit()
+        except sqlite3.Error:
+            return MISS
+        return datetime.fromtimestamp(creation_ts) if creation_ts is not None else None
+
+    def set(self, domain, creation_date):
+        """Simpan hasil lookup; creation_date None berarti lookup gagal (negative cache)"""
+        domain = domain.lower()
+        now = time.time()
+        creation_ts = creation_date.timestamp() if creation_date is not None else None
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO whois_cache (domain, creation_ts, fetched_at, last_access)'
+                    ' VALUES (?, ?, ?, ?)',
+                    (domain, creation_ts, now, now)
+                )
+                self._writes_since_evict += 1
+                # Eviksi dicek berkala, bukan setiap insert, agar COUNT(*) tidak jalan terus
+                if self._writes_since_evict >= 100:
+                    self._writes_since_evict = 0
+                    self._evict(conn)
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn):
+        count = conn.execute('SELECT COUNT(*) FROM whois_cache').fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                'DELETE FROM whois_cache WHERE domain IN ('
+                ' SELECT domain FROM whois_cache ORDER BY last_access ASC LIMIT ?)',
+                (excess,)
+            )
@@ -0,0 +1,142 @@
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+
+WHOIS_PORT = 43
+IANA_WHOIS_SERVER = 'whois.iana.org'
+DEFAULT_TIMEOUT = 5
+
+# Server WHOIS yang sering dipakai, supaya tidak perlu tanya IANA dulu
+KNOWN_WHOIS_SERVERS = {
+    'com': 'whois.verisign-grs.com',
+    'net': 'whois.verisign-grs.com',
+    'org': 'whois.publicinterestregistry.org',
+    'id': 'whois.id',
+    'io': 'whois.nic.io',
+    'info': 'whois.nic.info',
+    'app': 'whois.nic.google',
+    'dev': 'whois.nic.google',
+}
+
+# Label tanggal pembuatan pada berbagai format respon registry
+CREATION_PATTERNS = [
+    r'creation date:\s*(.+)',
+    r'created(?: on)?:\s*(.+)',
+    r'registered on:\s*(.+)',
+    r'registration time:\s*(.+)',
+    r'domain registration date:\s*(.+)',
+    r'registered:\s*(.+)',
+]
+
+DATE_FORMATS = [
+    '%Y-%m-%dT%H:%M:%SZ',
+    '%Y-%m-%dT%H:%M:%S.%fZ',
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%dT%H:%M:%S.%f%z',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%d-%b-%Y',
+    '%d.%m.%Y',
+    '%Y.%m.%d',
+    '%Y/%m/%d',
+    '%Y%m%d',
+]
+
+_server_cache = {}
+_server_lock = threading.Lock()
+# (host, port) pengganti untuk semua query, misalnya server WHOIS lokal saat benchmark
+_server_override = None
+
+
+def use_whois_server(address):
+    """Arahkan semua lookup ke satu server WHOIS (host, port); None = kembali ke server registry"""
+    global _server_override
+    _server_override = address
+
+
+def query(server, text, deadline, port=WHOIS_PORT):
+    """
+    Kirim satu query WHOIS lewat socket TCP biasa.
+
+    `deadline` adalah waktu absolut (time.monotonic()) untuk seluruh query,
+    sehingga timeout berlaku per panggilan tanpa mengubah socket.setdefaulttimeout.
+    """
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise socket.timeout('WHOIS deadline exceeded')
+    chunks = []
+    with socket.create_connection((server, port), timeout=remaining) as sock:
+        sock.sendall((text + '\r\n').encode('utf-8'))
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout('WHOIS deadline exceeded')
+            sock.settimeout(remaining)
+            data = sock.recv(4096)
+            if not data:
+                break
+            chunks.append(data)
+    return b''.join(chunks).decode('utf-8', errors='replace')
+
+
+def find_whois_server(tld, deadline):
+    """Cari server WHOIS untuk sebuah TLD (hasil referral IANA di-cache per proses)"""
+    tld = tld.lower()
+    if tld in KNOWN_WHOIS_SERVERS:
+        return KNOWN_WHOIS_SERVERS[tld]
+    with _server_lock:
+        if tld in _server_cache:
+            return _server_cache[tld]
+    response = query(IANA_WHOIS_SERVER, tld, deadline)
+    match = re.search(r'^(?:refer|whois):\s*(\S+)', response, re.IGNORECASE | re.MULTILINE)
+    server = match.group(1) if match else None
+    with _server_lock:
+        _server_cache[tld] = server
+    return server
+
+
+def parse_creation_date(response):
+    """Ambil tanggal pembuatan domain dari teks respon WHOIS (naive datetime, UTC)"""
+    for pattern in CREATION_PATTERNS:
+        match = re.search(pattern, response, re.IGNORECASE)
+        if not match:
+            continue
+        value = match.group(1).strip()
+        for fmt in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            return parsed
+        # Beberapa registry menambahkan teks setelah tanggal, coba token pertama saja
+        first = value.split()[0] if value.split() else ''
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(first, fmt)
+            except ValueError:
+                continue
+    return None
+
+
+def lookup_creation_date(domain, timeout=DEFAULT_TIMEOUT):
+    """
+    Lookup tanggal pembuatan domain dengan satu deadline untuk seluruh proses
+    (referral IANA + query registry). Return None jika gagal atau timeout.
+    """
+    deadline = time.monotonic() + timeout
+    domain = domain.lower().strip('.')
+    tld = domain.rsplit('.', 1)[-1]
+    try:
+        if _server_override is not None:
+            host, port = _server_override
+            return parse_creation_date(query(host, domain, deadline, port))
+        server = find_whois_server(tld, deadline)
+        if not server:
+            return None
+        return parse_creation_date(query(server, domain, deadline))
+    except (OSError, UnicodeError):
+        return None
@@ -1,295 +1,107 @@
 import streamlit as st
-import pandas as pd
 import sys
 import os
-import json
-import pickle
-import numpy as np
+import time
 
 # Add utils to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 from url_features import extract_url_features
-
-REPORT_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'reported_phishing_urls.json')
-MODEL_FILE = os.path.join(os.path.dirname(__file__), '..', 'phishing_model.pkl')
+import phishing_detector
+from report_store import get_report_store
+import blocklist
+from url_parse import parse_url
+from verdict_cache import get_verdict_cache, MISS
+from allowlist import get_allowlist
+import tracing
+import metrics
 
 # Load model
 @st.cache_resource
 def load_phishing_model():
     """Load the trained phishing detection model"""
     try:
-        with open(MODEL_FILE, 'rb') as f:
-            model = pickle.load(f)
-        return model
+        return phishing_detector.get_model()
     except Exception as e:
         st.error(f"Error loading model: {e}")
         return None
 
-# Fungsi bantu untuk baca/tulis report
+# Fungsi bantu untuk baca/tulis report (SQLite WAL, dipakai bersama semua sesi)
 
-def load_reported_urls():
+def is_reported_url(url, parsed=None):
+    """Cek laporan pengguna, lalu blocklist feed besar (Bloom filter) untuk URL & host-nya"""
     try:
-        if not os.path.exists(REPORT_FILE) or os.path.getsize(REPORT_FILE) == 0:
-            # Jika file tidak ada atau kosong, inisialisasi dengan list kosong
-            with open(REPORT_FILE, 'w') as f:
-                json.dump([], f)
-            return set()
-        with open(REPORT_FILE, 'r') as f:
-            data = json.load(f)
-            return set([u.lower() for u in data if isinstance(u, str)])
+        return blocklist.is_reported_url((parsed or parse_url(url)).canonical)
     except Exception:
-        return set()
+        return False
 
 def save_reported_url(url):
-    urls = load_reported_urls()
-    urls.add(url.lower())
-    with open(REPORT_FILE, 'w') as f:
-        json.dump(list(urls), f)
+    get_report_store().add(url)
+    metrics.USER_REPORTS.inc(kind='url')
 
-def extract_model_features(url):
-    """Extract features compatible with the trained model"""
+def predict_phishing_with_model(url, parsed=None):
+    """Predict phishing using the trained model"""
     try:
-        from urllib.parse import urlparse
-        import tldextract
-        
-        parsed = urlparse(url)
-        extracted = tldextract.extract(url)
-        hostname = parsed.hostname or ""
-        hostname_l = hostname.lower()
-        # Root domain (tanpa subdomain) untuk fitur yang seharusnya tidak bias oleh subdomain normal seperti dashboard.*
-        registered_domain = ".".join([p for p in [extracted.domain, extracted.suffix] if p]).lower()
-        
-        # Fungsi untuk cek typo domain
-        def is_typo_domain(domain, threshold=0.8):
-            """Cek apakah domain mirip dengan domain populer (typo-squatting)"""
-            from difflib import SequenceMatcher
-            popular_domains = [
-                'microsoft.com', 'google.com', 'facebook.com', 'apple.com', 'amazon.com',
-                'paypal.com', 'ebay.com', 'yahoo.com', 'instagram.com', 'twitter.com',
-                'linkedin.com', 'netflix.com', 'whatsapp.com', 'telegram.org', 'bankofamerica.com',
-                'wellsfargo.com', 'chase.com', 'gmail.com', 'outlook.com', 'icloud.com'
-            ]
-            domain = domain.lower()
-            for popular in popular_domains:
-                base = popular.split('.')[0]
-                ratio = SequenceMatcher(None, domain, base).ratio()
-                if ratio >= threshold and domain != base:
-                    return 1
-            return 0
-        
-        features = {
-            'having_IP_Address': -1 if hostname and hostname.replace('.', '').isdigit() else 1,
-            'URL_Length': 1 if len(url) > 75 else 0,
-            'Shortining_Service': 1 if any(service in url for service in ['bit.ly', 'goo.gl', 'tinyurl']) else -1,
-            'having_At_Symbol': 1 if '@' in url else -1,
-            'double_slash_redirecting': 1 if '//' in url[8:] else -1,
-            'Prefix_Suffix': 1 if '-' in hostname else -1,
-            # Dataset-style: banyak subdomain biasanya mencurigakan. Satu subdomain seperti dashboard.* umum pada SaaS.
-            # 0 = normal/sedang, 1 = banyak subdomain
-            'having_Sub_Domain': 1 if (hostname_l and not hostname_l.startswith('www.') and hostname_l.count('.') >= 3) else 0,
-            'SSLfinal_State': 1 if parsed.scheme == 'https' else -1,
-            # Pakai panjang root-domain, bukan hostname penuh (biar subdomain normal tidak dianggap mencurigakan)
-            'Domain_registeration_length': 1 if len(extracted.domain) > 10 else -1,
-            'Favicon': 1,  # Default value
-            'port': 1 if parsed.port else -1,
-            'HTTPS_token': 1 if hostname and ('https' in hostname_l) else -1,
-            # Root path "/" itu normal; jangan dianggap request/path mencurigakan.
-            'Request_URL': 1 if (parsed.path and parsed.path != "/") else -1,
-            'URL_of_Anchor': 0,  # Default value
-            'Links_in_tags': 0,  # Default value
-            'SFH': 0,  # Default value
-            'Submitting_to_email': -1,  # Default value
-            'Abnormal_URL': 1 if any(suspicious in url for suspicious in ['login', 'secure', 'verify']) else -1,
-            'Redirect': 0,  # Default value
-            'on_mouseover': 1,  # Default value
-            'RightClick': 1,  # Default value
-            'popUpWidnow': 1,  # Default value
-            'Iframe': 1,  # Default value
-            'age_of_domain': 1,  # Default value
-            'DNSRecord': 1,  # Default value
-            'web_traffic': -1,  # Default value
-            'Page_Rank': -1,  # Default value
-            'Google_Index': -1,  # Default value
-            'Links_pointing_to_page': 1,  # Default value
-            'Statistical_report': 1,  # Default value
-            'is_typo_domain': is_typo_domain(extracted.domain)  # Tambahkan fitur yang hilang
-        }
-        
-        return features
+        return phishing_detector.predict_phishing_with_model(url, load_phishing_model(), parsed)
     except Exception as e:
-        st.error(f"Error extracting features: {e}")
-        return None
-
-def predict_phishing_with_model(url):
-    """Predict phishing using the trained model"""
-    # Whitelist untuk domain legitimate terkenal
-    legitimate_domains = [
-        'youtube.com', 'www.youtube.com',
-        'google.com', 'www.google.com',
-        'facebook.com', 'www.facebook.com',
-        'github.com', 'www.github.com',
-        'stackoverflow.com', 'www.stackoverflow.com',
-        'reddit.com', 'www.reddit.com',
-        'twitter.com', 'www.twitter.com',
-        'instagram.com', 'www.instagram.com',
-        'linkedin.com', 'www.linkedin.com',
-        'netflix.com', 'www.netflix.com',
-        'amazon.com', 'www.amazon.com',
-        'microsoft.com', 'www.microsoft.com',
-        'apple.com', 'www.apple.com',
-        'wikipedia.org', 'www.wikipedia.org',
-        'mozilla.org', 'www.mozilla.org',
-        'ubuntu.com', 'www.ubuntu.com',
-        'python.org', 'www.python.org',
-        'nodejs.org', 'www.nodejs.org',
-        'docker.com', 'www.docker.com',
-        'kubernetes.io', 'www.kubernetes.io',
-        'jenkins.io', 'www.jenkins.io',
-        'gitlab.com', 'www.gitlab.com',
-        'bitbucket.org', 'www.bitbucket.org',
-        'slack.com', 'www.slack.com',
-        'discord.com', 'www.discord.com',
-        'zoom.us', 'www.zoom.us',
-        'teams.microsoft.com', 'www.teams.microsoft.com',
-        'dropbox.com', 'www.dropbox.com',
-        'drive.google.com', 'www.drive.google.com',
-        'gmail.com', 'www.gmail.com',
-        'outlook.com', 'www.outlook.com',
-        'yahoo.com', 'www.yahoo.com',
-        'bing.com', 'www.bing.com',
-        'duckduckgo.com', 'www.duckduckgo.com',
-        'brave.com', 'www.brave.com',
-        'opera.com', 'www.opera.com',
-        'firefox.com', 'www.firefox.com',
-        'chrome.com', 'www.chrome.com',
-        'edge.com', 'www.edge.com',
-        'safari.com', 'www.safari.com'
-    ]
-    
-    # Whitelist untuk domain pendidikan Indonesia
-    education_domains = [
-        # Universitas Indonesia
-        'ui.ac.id', 'www.ui.ac.id',
-        'gunadarma.ac.id', 'www.gunadarma.ac.id', 'library.gunadarma.ac.id',
-        'itb.ac.id', 'www.itb.ac.id',
-        'ugm.ac.id', 'www.ugm.ac.id',
-        'unair.ac.id', 'www.unair.ac.id',
-        'undip.ac.id', 'www.undip.ac.id',
-        'unpad.ac.id', 'www.unpad.ac.id',
-        'ipb.ac.id', 'www.ipb.ac.id',
-        'unbraw.ac.id', 'www.unbraw.ac.id',
-        'unhas.ac.id', 'www.unhas.ac.id',
-        'uns.ac.id', 'www.uns.ac.id',
-        'unsoed.ac.id', 'www.unsoed.ac.id',
-        'unnes.ac.id', 'www.unnes.ac.id',
-        'unm.ac.id', 'www.unm.ac.id',
-        'unand.ac.id', 'www.unand.ac.id',
-        'unsri.ac.id', 'www.unsri.ac.id',
-        'unila.ac.id', 'www.unla.ac.id',
-        'unmul.ac.id', 'www.unmul.ac.id',
-        'untan.ac.id', 'www.untan.ac.id',
-        'unud.ac.id', 'www.unud.ac.id',
-        'unram.ac.id', 'www.unram.ac.id',
-        'unhalu.ac.id', 'www.unhalu.ac.id',
-        'untad.ac.id', 'www.untad.ac.id',
-        'unima.ac.id', 'www.unima.ac.id',
-        'unpatti.ac.id', 'www.unpatti.ac.id',
-        'unipa.ac.id', 'www.unipa.ac.id',
-        'unmus.ac.id', 'www.unmus.ac.id',
-        'unp.ac.id', 'www.unp.ac.id',
-        'unand.ac.id', 'www.unand.ac.id',
-        'unsri.ac.id', 'www.unsri.ac.id',
-        'unila.ac.id', 'www.unila.ac.id',
-        'unmul.ac.id', 'www.unmul.ac.id',
-        'untan.ac.id', 'www.untan.ac.id',
-        'unud.ac.id', 'www.unud.ac.id',
-        'unram.ac.id', 'www.unram.ac.id',
-        'unhalu.ac.id', 'www.unhalu.ac.id',
-        'untad.ac.id', 'www.untad.ac.id',
-        'unima.ac.id', 'www.unima.ac.id',
-        'unpatti.ac.id', 'www.unpatti.ac.id',
-        'unipa.ac.id', 'www.unipa.ac.id',
-        'unmus.ac.id', 'www.unmus.ac.id',
-        'unp.ac.id', 'www.unp.ac.id',
-        # Institut
-        'its.ac.id', 'www.its.ac.id',
-        'ipb.ac.id', 'www.ipb.ac.id',
-        'isi.ac.id', 'www.isi.ac.id',
-        'ipdn.ac.id', 'www.ipdn.ac.id',
-        # Politeknik
-        'polban.ac.id', 'www.polban.ac.id',
-        'poltek.ac.id', 'www.poltek.ac.id',
-        'polinema.ac.id', 'www.polinema.ac.id',
-        'polman.ac.id', 'www.polman.ac.id',
-        'polines.ac.id', 'www.polines.ac.id',
-        'poltekkes.ac.id', 'www.poltekkes.ac.id',
-        # Sekolah Tinggi
-        'stis.ac.id', 'www.stis.ac.id',
-        'stmik.ac.id', 'www.stmik.ac.id',
-        'stikom.ac.id', 'www.stikom.ac.id',
-        'stie.ac.id', 'www.stie.ac.id',
-        'stkip.ac.id', 'www.stkip.ac.id',
-        # Domain pendidikan umum
-        'ac.id', 'www.ac.id',
-        'sch.id', 'www.sch.id',
-        'go.id', 'www.go.id'
-    ]
-    
-    # Gabungkan semua whitelist
-    all_legitimate_domains = legitimate_domains + education_domains
-    
-    # Cek apakah domain ada di whitelist
-    from urllib.parse import urlparse
-    parsed = urlparse(url if url.startswith(("http://", "https://")) else ("http://" + url))
-    domain = (parsed.hostname or "").lower()
-    
-    if domain in all_legitimate_domains:
-        return 0, 0.95  # Legitimate dengan confidence tinggi
-    
-    model = load_phishing_model()
-    if model is None:
-        return None, 0.0
-    
-    features = extract_model_features(url)
-    if features is None:
+        st.error(f"Error predicting: {e}")
         return None, 0.0
-    
-    try:
-        # Convert to DataFrame
-        feature_df = pd.DataFrame([features])
-        
-        # Predict
-        prediction = model.predict(feature_df)[0]
-        probability = model.predict_proba(feature_df)[0]
 
-        confidence = max(probability)
+def analyze_url(url, parsed):
+    """Jalankan model, aturan tambahan, dan override laporan; hasil akhir (prediction, confidence, features)"""
+    # Use ML model for prediction
+    with tracing.span('model'):
+        prediction, confidence = predict_phishing_with_model(url, parsed)
 
-        # Guardrail anti false-positive (tanpa whitelist):
-        # Jika hampir semua sinyal model menunjukkan "normal/aman" dan confidence phishing tidak terlalu tinggi,
-        # jangan langsung cap phishing. Ini khusus untuk URL "bersih" seperti dashboard SaaS yang sering false positive.
-        if int(prediction) == 1 and confidence < 0.80:
-            looks_clean = (
-                features.get('SSLfinal_State') == 1
-                and features.get('having_IP_Address') == 1
-                and features.get('Shortining_Service') == -1
-                and features.get('having_At_Symbol') == -1
-                and features.get('double_slash_redirecting') == -1
-                and features.get('Prefix_Suffix') == -1
-                and features.get('having_Sub_Domain') == 0
-                and features.get('Domain_registeration_length') == -1
-                and features.get('HTTPS_token') == -1
-                and features.get('Abnormal_URL') == -1
-                and features.get('URL_Length') == 0
-                # Jika URL sudah punya path/konten request, jangan dianggap "bersih" (sering dipakai phishing pages)
-                and features.get('Request_URL') == -1
-            )
-            if looks_clean:
-                return 0, max(0.70, 1 - confidence)
+    # Extract features for display
+    with tracing.span('url_features'):
+        features = extract_url_features(url, parsed)
 
-        return prediction, confidence
-    except Exception as e:
-        st.error(f"Error predicting: {e}")
-        return None, 0.0
+    # Rule akademik/pemerintah dan judi (sama dengan REST API)
+    prediction, confidence = phishing_detector.apply_url_rules(prediction, confidence, parsed, features)
+
+    # Override: jika ada di report, langsung berbahaya
+    with tracing.span('report_check'):
+        is_reported = is_reported_url(url, parsed)
+
+    if is_reported:
+        prediction = 1
+        confidence = 0.95
+
+    return prediction, confidence, features
+
+def analyze_url_cached(url, parsed):
+    """
+    analyze_url dengan verdict cache. Kuncinya URL mentah, bukan URL kanonik: fitur model
+    dihitung dari URL mentah (userinfo, www., port, urutan query), sehingga dua URL dengan
+    bentuk kanonik sama bisa mendapat skor berbeda. Bentuk kanonik hanya untuk laporan/blocklist.
+    Cache otomatis tidak berlaku jika file model, allowlist, atau blocklist berubah, atau ada
+    laporan baru di report store. Hasil dengan probe jaringan yang timeout tidak di-cache.
+    """
+    start = time.perf_counter()
+    cache = get_verdict_cache()
+    generation = ':'.join([
+        phishing_detector.model_fingerprint(),
+        str(get_report_store().version),
+        get_allowlist().version,
+        blocklist.get_blocklist().version,
+    ])
+    with tracing.span('verdict_cache.get') as span:
+        cached = cache.get(url, generation)
+        span.set(hit=cached is not MISS)
+    metrics.VERDICT_CACHE_LOOKUPS.inc(result='miss' if cached is MISS else 'hit')
+    if cached is not MISS:
+        metrics.URL_ANALYSES.inc(source='cache')
+        metrics.URL_ANALYSIS_SECONDS.observe(time.perf_counter() - start, source='cache')
+        return cached
+    prediction, confidence, features = analyze_url(url, parsed)
+    # Verdict dengan probe timeout memakai nilai default; jangan ditahan selama TTL cache
+    degraded = any(value for name, value in (features or {}).items() if name.endswith('_timed_out'))
+    if prediction is not None and not degraded:
+        with tracing.span('verdict_cache.set'):
+            cache.set(url, generation, prediction, confidence, features)
+    metrics.URL_ANALYSES.inc(source='fresh')
+    metrics.URL_ANALYSIS_SECONDS.observe(time.perf_counter() - start, source='fresh')
+    return prediction, confidence, features
 
 def show_phishing_detection():
     """Show phishing URL detection interface"""
@@ -320,75 +132,46 @@ def show_phishing_detection():
         st.info(f"Contoh URL: {st.session_state.example_url}")
         url_input = st.session_state.example_url
     
-    # Analysis section
+    # URL di-parse sekali (suffix, bentuk kanonik), dipakai di semua tahap analisis.
+    # Semua tahap (parse, cache, model, probe jaringan, laporan) dicatat dalam satu trace.
+    parsed = None
+    analysis_trace = None
     if analyze_button and url_input:
-        st.markdown("---")
-        st.subheader("🔍 Hasil Analisis")
-        
-        with st.spinner("Menganalisis URL dengan AI..."):
-            # Use ML model for prediction
-            prediction, confidence = predict_phishing_with_model(url_input)
-            
-            # Extract features for display
-            features = extract_url_features(url_input)
-
-            # Rule 1: Lindungi domain akademik/pemerintah dari false positive berlebihan
+        with tracing.trace('phishing_detection', url=url_input) as analysis_trace:
             try:
-                import tldextract
-                extracted = tldextract.extract(url_input)
-                suffix = f"{extracted.suffix}".lower()  # contoh: "ac.id"
-            except Exception:
-                suffix = ""
-
-            safe_suffixes = {"ac.id", "edu", "sch.id", "go.id"}
-            if prediction == 1 and suffix in safe_suffixes and features:
-                # Jika URL terlihat cukup aman menurut fitur, turunkan menjadi LEGITIMATE / waspada
-                safe_signals = 0
-                if features.get('https_used') == 1:
-                    safe_signals += 1
-                if features.get('ip_in_domain') == 0:
-                    safe_signals += 1
-                if features.get('at_symbol') == 0:
-                    safe_signals += 1
-                if features.get('suspicious_words', 0) == 0:
-                    safe_signals += 1
-                if features.get('redirect_count', 0) <= 1:
-                    safe_signals += 1
-
-                if safe_signals >= 4 and (confidence is not None) and confidence <= 0.97:
-                    prediction = 0
-                    # turunkan confidence sehingga tampil sebagai LEGITIMATE (Sedang), bukan Aman penuh
-                    confidence = max(0.70, min(confidence, 0.85))
-
-            # Rule 2: Tingkatkan deteksi untuk URL judi/gaming berisiko tinggi
-            if features and features.get('is_judol') == 1 and prediction == 0:
-                prediction = 1
-                if confidence is None or confidence < 0.85:
-                    confidence = 0.88
-
-            # Override: jika ada di report, langsung berbahaya
-            reported_urls = load_reported_urls()
-            is_reported = url_input.lower() in reported_urls
-            
-            if is_reported:
-                prediction = 1
-                confidence = 0.95
+                with tracing.span('parse_url'):
+                    parsed = parse_url(url_input)
+            except ValueError as e:
+                st.error(f"URL tidak valid: {e}")
             
-            # Calculate risk score based on ML prediction
-            if prediction == 1:  # Phishing
-                risk_score = int(confidence * 100)
-            else:  # Legitimate
-                risk_score = int((1 - confidence) * 20)  # Low risk for legitimate
-            
-            # Display results
-            display_phishing_results(url_input, features, risk_score, is_reported, prediction, confidence)
-            
-            # Tombol report
-            if not is_reported and prediction == 0:
-                if st.button('Laporkan Salah Deteksi (URL ini Phishing!)'):
-                    save_reported_url(url_input)
-                    st.success('URL berhasil dilaporkan sebagai phishing. Jika dicek lagi, akan selalu dianggap berbahaya.')
-                    st.experimental_rerun()
+            # Analysis section
+            if parsed is not None:
+                st.markdown("---")
+                st.subheader("🔍 Hasil Analisis")
+                
+                with st.spinner("Menganalisis URL dengan AI..."):
+                    prediction, confidence, features = analyze_url_cached(url_input, parsed)
+                    with tracing.span('report_status'):
+                        is_reported = is_reported_url(url_input, parsed)
+                    metrics.URL_VERDICTS.inc(risk=risk_category(prediction, confidence))
+    
+    if parsed is not None:
+        # Calculate risk score based on ML prediction
+        if prediction == 1:  # Phishing
+            risk_score = int(confidence * 100)
+        else:  # Legitimate
+            risk_score = int((1 - confidence) * 20)  # Low risk for legitimate
+        
+        # Display results
+        display_phishing_results(url_input, features, risk_score, is_reported, prediction, confidence,
+                                 analysis_trace)
+        
+        # Tombol report
+        if not is_reported and prediction == 0:
+            if st.button('Laporkan Salah Deteksi (URL ini Phishing!)'):
+                save_reported_url(url_input)
+                st.success('URL berhasil dilaporkan sebagai phishing. Jika dicek lagi, akan selalu dianggap berbahaya.')
+                st.experimental_rerun()
     
     # Information section
     st.markdown("---")
@@ -417,8 +200,25 @@ def show_phishing_detection():
         - Update browser secara berkala
         """)
 
-def display_phishing_results(url, features, risk_score, is_reported=False, prediction=None, confidence=None):
+# Kategori risiko untuk statistik deteksi (urutan tampilan chart)
+RISK_CATEGORIES = ['Aman', 'Rendah', 'Sedang', 'Tinggi', 'Sangat Tinggi']
+
+def risk_category(prediction, confidence):
+    if prediction == 1 and confidence >= 0.9:
+        return 'Sangat Tinggi'
+    if prediction == 1 and confidence >= 0.7:
+        return 'Tinggi'
+    if prediction == 1:
+        return 'Sedang'
+    if prediction == 0 and confidence < 0.8:
+        return 'Rendah'
+    return 'Aman'
+
+def display_phishing_results(url, features, risk_score, is_reported=False, prediction=None, confidence=None,
+                             trace=None):
     """Display phishing analysis results"""
+    # pandas hanya dibutuhkan untuk tabel/chart hasil, tidak ikut di-import saat startup
+    import pandas as pd
     
     # Risk level based on ML prediction
     if prediction == 1:  # Phishing detected
@@ -512,30 +312,36 @@ def display_phishing_results(url, features, risk_score, is_reported=False, predi
     with st.expander("🔍 Detail Fitur"):
         st.dataframe(pd.DataFrame([features]).T, use_container_width=True)
     
+    # Waktu per tahap untuk request ini (dari trace analisis)
+    if trace is not None:
+        with st.expander(f"⏱️ Waktu Analisis per Tahap ({trace.duration_ms:.0f} ms)"):
+            display_stage_breakdown(trace)
+    
     if is_reported:
         st.warning('URL ini sudah pernah dilaporkan sebagai phishing oleh pengguna.')
     
-    # Statistik chart (bar chart)
+    # Statistik chart (bar chart): distribusi hasil seluruh analisis di server (metrik proses)
     st.subheader('📈 Statistik Deteksi')
-    stats_keys = ['Aman', 'Rendah', 'Sedang', 'Tinggi', 'Sangat Tinggi']
-    # Simpan statistik ke session
-    if 'phishing_stats' not in st.session_state:
-        st.session_state['phishing_stats'] = {k: 0 for k in stats_keys}
-    # Update statistik
-    if prediction == 1 and confidence >= 0.9:
-        st.session_state['phishing_stats']['Sangat Tinggi'] += 1
-    elif prediction == 1 and confidence >= 0.7:
-        st.session_state['phishing_stats']['Tinggi'] += 1
-    elif prediction == 1:
-        st.session_state['phishing_stats']['Sedang'] += 1
-    elif prediction == 0 and confidence < 0.8:
-        st.session_state['phishing_stats']['Rendah'] += 1
-    else:
-        st.session_state['phishing_stats']['Aman'] += 1
-    # Pastikan semua kategori ada dan bertipe int
     stats_df = pd.DataFrame({
-        'Kategori': stats_keys,
-        'Jumlah': [int(st.session_state['phishing_stats'].get(k, 0)) for k in stats_keys]
+        'Kategori': RISK_CATEGORIES,
+        'Jumlah': [int(metrics.URL_VERDICTS.total(risk=k)) for k in RISK_CATEGORIES]
     })
     stats_df.set_index('Kategori', inplace=True)
-    st.bar_chart(stats_df) 
\ No newline at end of file
+    st.bar_chart(stats_df) 
+
+def display_stage_breakdown(trace):
+    """Tabel tahap analisis: nama (indentasi sesuai tahap induk), durasi, dan thread"""
+    import pandas as pd
+    
+    rows = []
+    for span in trace.breakdown():
+        attributes = ', '.join(f'{k}={v}' for k, v in span['attributes'].items() if k != 'url')
+        rows.append({
+            'Tahap': '\u2003' * span['depth'] + span['name'],
+            'Mulai (ms)': span['offset_ms'],
+            'Durasi (ms)': span['duration_ms'] if span['duration_ms'] is not None else float('nan'),
+            'Thread': span['thread'],
+            'Keterangan': span['error'] or attributes,
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    st.caption('Durasi kosong = tahap belum selesai saat hasil ditampilkan (misalnya probe jaringan yang melewati deadline).')
@@ -1,4 +1,9 @@
 import streamlit as st
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
+import metrics
 
 def create_sidebar():
     """Create sidebar navigation"""
@@ -27,8 +32,8 @@ def create_sidebar():
     st.sidebar.subheader("📊 Statistik")
     st.sidebar.metric(
         label="URL Diperiksa",
-        value="1,234",
-        help="Total URL yang telah dianalisis"
+        value=f"{int(metrics.URL_ANALYSES.total()):,}",
+        help="Total URL yang telah dianalisis di server ini"
     )
     
     st.sidebar.markdown("---")